@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark for the capstone app.
+
+Runs two fresh interpreters:
+  1. `python -X importtime -c "import app"` and reports the slowest modules
+     by cumulative import time;
+  2. a child that imports the app, logs in through the Flask test client and
+     renders the About page via display_page, timing each phase.
+
+Fails (exit code 1) when time-to-first-request exceeds the budget.
+
+    python bench_startup.py                 # budget from STARTUP_BUDGET_MS (default 3000)
+    python bench_startup.py --budget-ms 1500 --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Executed in a fresh interpreter; prints one JSON line of phase timings (ms)
+FIRST_REQUEST = r'''
+import json, time
+t0 = time.perf_counter()
+import app
+from pages.login import server
+t1 = time.perf_counter()
+client = server.test_client()
+client.post('/login', data={'username': 'admin', 'password': 'password'})
+client.get('/')
+t2 = time.perf_counter()
+body = {
+    'output': 'page-content.children',
+    'outputs': {'id': 'page-content', 'property': 'children'},
+    'inputs': [{'id': 'url', 'property': 'pathname', 'value': '/'}],
+    'changedPropIds': ['url.pathname'],
+}
+response = client.post('/_dash-update-component', json=body)
+assert response.status_code == 200, response.status_code
+t3 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'index_ms': (t2 - t1) * 1000,
+    'first_render_ms': (t3 - t2) * 1000,
+}))
+'''
+
+
+def import_times(top):
+    """
+    Returns the `top` slowest modules as (cumulative_us, self_us, module) tuples.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def first_request():
+    """
+    Returns phase timings of a cold process serving its first About page render.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', FIRST_REQUEST],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases['total_ms'] = (time.perf_counter() - start) * 1000  # includes interpreter startup
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 3000)),
+                        help='time-to-first-request budget in milliseconds')
+    parser.add_argument('--top', type=int, default=20, help='number of modules to list')
+    parser.add_argument('--runs', type=int, default=3, help='cold starts to time; the median is reported')
+    args = parser.parse_args()
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in import_times(args.top):
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+
+    runs = sorted((first_request() for _ in range(args.runs)), key=lambda r: r['total_ms'])
+    median = runs[len(runs) // 2]
+    print()
+    for phase, value in median.items():
+        print(f"{phase:>16}: {value:8.1f} ms")
+
+    if median['total_ms'] > args.budget_ms:
+        print(f"\nFAIL: time to first request {median['total_ms']:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        return 1
+    print(f"\nOK: time to first request within {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
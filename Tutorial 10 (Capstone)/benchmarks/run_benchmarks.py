@@ -0,0 +1,291 @@
+"""
+Callback micro-benchmarks on synthetic data.
+
+For each --rows scale, writes a synthetic gapminder dataset (benchmarks/synthetic.py)
+into a scratch dataset cache and starts a fresh interpreter that loads the app
+on it, the way a worker would (memory-mapped Arrow, compacted, indexed). That
+interpreter calls each callback function directly:
+
+  update_gapminder_table   default filters, a country selection, a sort, a filter row query
+  update_output            one country's Output page (figures built, not cached)
+  download_filtered        CSV and Parquet export of a filtered selection
+  assignment4 / 5          the Tutorial 6/7 chart callbacks, given the same rows
+
+Every case runs one untimed warm-up round, then --rounds times with caches
+cleared in between. The results record wall time stats, plus the peak traced
+allocation (tracemalloc, one extra round) and the process RSS. They are written to a JSON file shaped like
+pytest-benchmark's (machine_info, commit_info, benchmarks[].stats).
+--compare prints the median change against an earlier file. It fails (exit
+code 1) when any case got slower than --max-regression times its baseline.
+
+    python benchmarks/run_benchmarks.py                          # 1e5 and 1e6 rows
+    python benchmarks/run_benchmarks.py --rows 1e5,1e6,1e7 --rounds 3
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+REPO_DIR = os.path.dirname(APP_DIR)
+sys.path.insert(0, APP_DIR)
+
+from benchmarks.synthetic import write_arrow  # noqa: E402
+
+COUNTRIES = ['Chile', 'Japan', 'Kenya', 'Sweden', 'India']  # Real countries, present at every scale
+TABLE_QUERIES = {
+    'table_default': {},
+    'table_countries': {'selected_countries': COUNTRIES},
+    'table_sorted': {'sort_by': [{'column_id': 'pop', 'direction': 'desc'}], 'page_current': 3},
+    'table_filter_query': {'filter_query': '{continent} = Asia && {lifeExp} > 60', 'page_current': 5},
+}
+DOWNLOAD_QUERY = 'lifeexp_min=70&pop_min=1000000'
+
+
+def load_assignment(folder, filename, df):
+    """
+    Imports a tutorial app from its own folder (it reads its CSV at import) and points it at df.
+    """
+    path = os.path.join(REPO_DIR, folder, filename)
+    spec = importlib.util.spec_from_file_location(os.path.splitext(filename)[0], path)
+    module = importlib.util.module_from_spec(spec)
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(path))
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    module.df = df
+    return module
+
+
+def cases():
+    """
+    Returns (group, name, setup, fn) tuples for the loaded app; setup runs untimed before every round.
+    """
+    from pages.datasets import registry
+    from pages.figure_cache import figure_cache
+    from pages.filter_cache import filter_cache
+    from pages.login import server
+    from pages.output import update_gapminder_table, update_output
+
+    def cold():
+        filter_cache.set_version(None)
+        figure_cache.set_version(None)
+
+    table = []
+    for name, overrides in TABLE_QUERIES.items():
+        query = dict(pop_min=None, pop_max=None, lifeexp_min=None, lifeexp_max=None, selected_countries=None,
+                     page_current=0, page_size=10, sort_by=[], filter_query='')
+        query.update(overrides)
+        table.append(('update_gapminder_table', name, cold, lambda q=query: update_gapminder_table(q, None)))
+
+    client = server.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'password'})
+
+    def download(fmt):
+        response = client.get(f'/download/filtered_gapminder.{fmt}?{DOWNLOAD_QUERY}')
+        assert response.status_code == 200, response.status_code
+        response.get_data()
+        response.close()
+
+    # The tutorial apps read the CSV with plain object/int64 columns
+    plain = registry['gapminder'].df[['country', 'year', 'pop', 'continent', 'lifeExp', 'gdpPercap']].astype(
+        {'country': object, 'continent': object, 'year': 'int64', 'pop': 'int64'}
+    )
+    assignment4 = load_assignment('Tutorial 6 (Assignment 4)', 'assignment4.py', plain)
+    assignment5 = load_assignment('Tutorial 7 (Assignment 5)', 'assignment5.py', plain)
+    output_data = {'lat': -33.45, 'lon': -70.67, 'dataset': 'gapminder', 'country': 'Chile'}
+
+    return table + [
+        ('update_output', 'output_country', cold, lambda: update_output(output_data)),
+        ('download_filtered', 'download_csv', cold, lambda: download('csv')),
+        ('download_filtered', 'download_parquet', cold, lambda: download('parquet')),
+        ('assignment4', 'gdp_pie_chart', None, lambda: assignment4.dynamic_updation_of_pie_chart(1, COUNTRIES)),
+        ('assignment5', 'scatter_plot', None, lambda: assignment5.updation_of_scatter_plot(COUNTRIES, [1952, 2007])),
+    ]
+
+
+def measure(setup, fn, rounds):
+    """
+    Returns (per-round seconds, peak traced allocation in bytes).
+    """
+    import tracemalloc
+    # Untimed warm-up: first-call imports and lazily built state would otherwise skew the first case
+    if setup:
+        setup()
+    fn()
+    times = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    # Separate round: tracing allocations slows the code down
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def stats(times):
+    return {
+        'min': min(times),
+        'max': max(times),
+        'mean': statistics.fmean(times),
+        'median': statistics.median(times),
+        'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'rounds': len(times),
+    }
+
+
+def child(rows, rounds):
+    """
+    Runs in the fresh interpreter: loads the app on the synthetic cache and benchmarks every case.
+    """
+    import psutil
+    process = psutil.Process()
+    start = time.perf_counter()
+    import app  # noqa: F401  Registers pages and callbacks
+    from pages.datasets import registry
+    from pages.login import server
+    dataset = registry['gapminder']
+    dataset.df
+    loaded = time.perf_counter()
+    for name in dataset.index_builders:
+        dataset.index(name)
+    indexed = time.perf_counter()
+    assert len(dataset.df) == rows, (len(dataset.df), rows)
+
+    params = {'rows': rows}
+    results = [
+        {'group': 'dataset', 'name': 'load', 'params': params, 'stats': stats([loaded - start]),
+         'extra_info': {'rss_bytes': process.memory_info().rss}},
+        {'group': 'dataset', 'name': 'build_indexes', 'params': params, 'stats': stats([indexed - loaded]),
+         'extra_info': {'rss_bytes': process.memory_info().rss}},
+    ]
+    with server.test_request_context('/'):
+        for group, name, setup, fn in cases():
+            times, peak = measure(setup, fn, rounds)
+            results.append({
+                'group': group, 'name': name, 'params': params, 'stats': stats(times),
+                'extra_info': {'peak_alloc_bytes': peak, 'rss_bytes': process.memory_info().rss},
+            })
+    for result in results:
+        result['fullname'] = f"{result['group']}::{result['name']}[{rows}]"
+    print(json.dumps(results))
+
+
+def run_scale(rows, rounds, years):
+    """
+    Generates `rows` synthetic rows and benchmarks them in a fresh interpreter; returns its results.
+    """
+    with tempfile.TemporaryDirectory(prefix='bench-data-') as cache_dir:
+        write_arrow(os.path.join(cache_dir, 'gapminder.arrow'), rows, years)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', str(rows), '--rounds', str(rounds)],
+            # The synthetic file has no source to check against; use it as it is
+            cwd=APP_DIR, env=dict(os.environ, DATASET_CACHE_DIR=cache_dir, DATASET_CHECK_SECONDS='0'),
+            capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f'benchmark at {rows:,} rows failed:\n{proc.stderr[-4000:]}')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def commit_info():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=APP_DIR, capture_output=True, text=True).stdout.strip()
+    return {'id': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--', '.'))}
+
+
+def compare(current, baseline_path, max_regression):
+    """
+    Prints median changes against a baseline file; returns the cases slower than max_regression.
+    """
+    with open(baseline_path) as f:
+        baseline = {b['fullname']: b for b in json.load(f)['benchmarks']}
+    print(f"\n{'case':<58} {'base ms':>9} {'now ms':>9} {'change':>8}")
+    regressions = []
+    for bench in current:
+        old = baseline.get(bench['fullname'])
+        if old is None:
+            continue
+        before, after = old['stats']['median'], bench['stats']['median']
+        ratio = after / before if before else float('inf')
+        print(f"{bench['fullname']:<58} {before * 1000:9.1f} {after * 1000:9.1f} {ratio:7.2f}x")
+        if ratio > max_regression:
+            regressions.append(bench['fullname'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1e5,1e6', help='comma-separated dataset sizes')
+    parser.add_argument('--years', type=int, default=56, help='annual years per synthetic country')
+    parser.add_argument('--rounds', type=int, default=5, help='timed rounds per case')
+    parser.add_argument('--out', default=os.path.join(HERE, 'results'), help='directory for the results JSON')
+    parser.add_argument('--compare', help='earlier results JSON to compare medians against')
+    parser.add_argument('--max-regression', type=float, default=float(os.environ.get('BENCH_MAX_REGRESSION', 1.25)),
+                        help='fail when a median exceeds this multiple of its baseline')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.rounds)
+        return 0
+
+    benchmarks = []
+    print(f"{'case':<58} {'median ms':>10} {'min ms':>9} {'peak MB':>8}")
+    for rows in (int(float(n)) for n in args.rows.split(',')):
+        for bench in run_scale(rows, args.rounds, args.years):
+            benchmarks.append(bench)
+            peak = bench['extra_info'].get('peak_alloc_bytes')
+            print(f"{bench['fullname']:<58} {bench['stats']['median'] * 1000:10.1f} "
+                  f"{bench['stats']['min'] * 1000:9.1f} {'' if peak is None else f'{peak / 2 ** 20:8.1f}'}")
+
+    commit = commit_info()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    results = {
+        'machine_info': {
+            'node': platform.node(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'commit_info': commit,
+        'datetime': now.isoformat(),
+        'benchmarks': benchmarks,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"callbacks_{now:%Y%m%dT%H%M%S}_{commit['id'][:8]}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nresults: {path}')
+
+    if args.compare:
+        regressions = compare(benchmarks, args.compare, args.max_regression)
+        if regressions:
+            print(f'\nFAIL: {len(regressions)} case(s) slower than {args.max_regression:.2f}x baseline: '
+                  + ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
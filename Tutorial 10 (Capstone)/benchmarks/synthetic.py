@@ -0,0 +1,184 @@
+"""
+Synthetic gapminder-schema data at any scale.
+
+Rows are countries x annual years. The 142 real gapminder countries come first,
+seeded from their actual 1952 figures; further countries ("Synthland 000143",
+...) draw their 1952 figures from lognormal fits to the real ones. Population
+and GDP per capita then grow at a per-country rate with year-to-year noise,
+and life expectancy follows log GDP per capita along a logistic curve, so
+filters and sorts see realistic skew and correlation.
+
+Output is in the app's compact form (categorical text, int16 years, int32
+population; see pages/compact.py) and is written in batches, so a 10^8-row
+Arrow file needs memory for one batch, not the whole frame.
+
+    python benchmarks/synthetic.py --rows 1000000 --out /tmp/gapminder.arrow
+    python benchmarks/synthetic.py --rows 100000 --years 74 --format csv --out gapminder_100k.csv
+"""
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+
+START_YEAR = 1952
+DEFAULT_YEARS = 56              # 1952-2007, the real data's span at annual resolution
+COUNTRIES_PER_BATCH = 20000
+
+
+def real_countries():
+    """
+    Returns the real gapminder countries' 1952 rows (country, continent, iso codes, pop, gdpPercap, lifeExp).
+    """
+    import plotly.express as px
+    df = px.data.gapminder()
+    return df[df['year'] == df['year'].min()].reset_index(drop=True)
+
+
+def country_table(count, seed=0):
+    """
+    Returns per-country columns for `count` countries: names, continents, iso
+    codes and the 1952 starting figures.
+    """
+    rng = np.random.default_rng(seed)
+    real = real_countries()
+    n_real = min(count, len(real))
+    n_fake = count - n_real
+    continents = sorted(real['continent'].unique())
+    weights = real['continent'].value_counts(normalize=True).reindex(continents).to_numpy()
+    log_pop = np.log(real['pop'].to_numpy(dtype=np.float64))
+    log_gdp = np.log(real['gdpPercap'].to_numpy())
+    ids = np.arange(n_real + 1, count + 1)
+    return {
+        'country': list(real['country'][:n_real]) + [f'Synthland {i:06d}' for i in ids],
+        'continent': np.concatenate([
+            real['continent'][:n_real].to_numpy(dtype=object),
+            np.array(continents, dtype=object)[rng.choice(len(continents), n_fake, p=weights)],
+        ]),
+        'iso_alpha': list(real['iso_alpha'][:n_real]) + [f'S{i:06d}' for i in ids],
+        'iso_num': np.concatenate([real['iso_num'][:n_real].to_numpy(), 1000 + ids]),
+        'pop': np.concatenate([
+            real['pop'][:n_real].to_numpy(dtype=np.float64),
+            np.clip(rng.lognormal(log_pop.mean(), log_pop.std(), n_fake), 5e4, 6e8),
+        ]),
+        'gdpPercap': np.concatenate([
+            real['gdpPercap'][:n_real].to_numpy(),
+            np.clip(rng.lognormal(log_gdp.mean(), log_gdp.std(), n_fake), 250, 1.1e5),
+        ]),
+        'lifeExp': real['lifeExp'][:n_real].to_numpy(),
+    }
+
+
+def _batch(countries, start, stop, years, seed, dtypes):
+    import pandas as pd
+    rng = np.random.default_rng([seed, start])
+    n = stop - start
+    t = np.arange(years)
+    # Per-country growth with year-to-year noise (a random walk in log space)
+    pop_growth = rng.normal(0.018, 0.008, (n, 1))
+    gdp_growth = rng.normal(0.021, 0.015, (n, 1))
+    log_pop = np.log(countries['pop'][start:stop, None]) + pop_growth * t + np.cumsum(rng.normal(0, 0.004, (n, years)), axis=1)
+    log_gdp = np.log(countries['gdpPercap'][start:stop, None]) + gdp_growth * t + np.cumsum(rng.normal(0, 0.03, (n, years)), axis=1)
+    # Life expectancy rises with income; a per-country offset keeps outliers
+    offset = rng.normal(0, 4, (n, 1))
+    life = 25 + 57 / (1 + np.exp(-1.1 * (log_gdp - 7.3))) + offset + 0.05 * t + rng.normal(0, 0.6, (n, years))
+    real_life = countries['lifeExp'][start:stop]
+    if len(real_life):  # Real countries start at their actual 1952 value
+        life[:len(real_life)] += (real_life - life[:len(real_life), 0])[:, None]
+    codes = np.repeat(np.arange(start, stop, dtype=np.int32), years)
+    return pd.DataFrame({
+        'country': pd.Categorical.from_codes(codes, dtype=dtypes['country']),
+        'continent': pd.Categorical.from_codes(countries['continent_code'][codes], dtype=dtypes['continent']),
+        'year': np.tile((START_YEAR + t).astype(np.int16), n),
+        'lifeExp': np.round(np.clip(life, 20, 88), 3).ravel(),
+        'pop': np.clip(np.exp(log_pop), 1e4, 2e9).astype(np.int32).ravel(),
+        'gdpPercap': np.exp(log_gdp).ravel(),
+        'iso_alpha': pd.Categorical.from_codes(countries['iso_alpha_code'][codes], dtype=dtypes['iso_alpha']),
+        'iso_num': countries['iso_num'][codes].astype(dtypes['iso_num']),
+    })
+
+
+def generate(rows, years=DEFAULT_YEARS, seed=0):
+    """
+    Yields DataFrame batches totalling `rows` rows, country by country (each
+    country's years contiguous, as group_rows expects). Deterministic for a
+    given (rows, years, seed).
+    """
+    import pandas as pd
+    count = math.ceil(rows / years)
+    countries = country_table(count, seed)
+    dtypes = {
+        'country': pd.CategoricalDtype(countries['country']),
+        'continent': pd.CategoricalDtype(sorted(set(countries['continent']))),
+        'iso_alpha': pd.CategoricalDtype(pd.unique(np.array(countries['iso_alpha'], dtype=object))),  # Both Koreas are KOR
+        'iso_num': np.int16 if countries['iso_num'].max() < 2 ** 15 else np.int32,
+    }
+    countries['continent_code'] = dtypes['continent'].categories.get_indexer(countries['continent']).astype(np.int8)
+    countries['iso_alpha_code'] = dtypes['iso_alpha'].categories.get_indexer(countries['iso_alpha']).astype(np.int32)
+    emitted = 0
+    for start in range(0, count, COUNTRIES_PER_BATCH):
+        batch = _batch(countries, start, min(count, start + COUNTRIES_PER_BATCH), years, seed, dtypes)
+        batch = batch.iloc[:rows - emitted]
+        emitted += len(batch)
+        yield batch
+
+
+def frame(rows, years=DEFAULT_YEARS, seed=0):
+    """
+    Returns the whole synthetic dataset as one DataFrame.
+    """
+    import pandas as pd
+    return pd.concat(generate(rows, years, seed), ignore_index=True)
+
+
+def write_arrow(path, rows, years=DEFAULT_YEARS, seed=0):
+    """
+    Writes the dataset as an uncompressed Arrow IPC file, the format of the
+    app's dataset cache (pages/datasets.py), one record batch at a time.
+    """
+    import pyarrow as pa
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    writer = None
+    schema = None
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            for batch in generate(rows, years, seed):
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table.cast(schema))
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_csv(path, rows, years=DEFAULT_YEARS, seed=0):
+    """
+    Writes the dataset as CSV with the columns of gapminderDataFiveYear.csv.
+    """
+    with open(path, 'w', newline='') as f:
+        for i, batch in enumerate(generate(rows, years, seed)):
+            batch[['country', 'year', 'pop', 'continent', 'lifeExp', 'gdpPercap']].to_csv(f, header=i == 0, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, required=True, help='number of rows, e.g. 1e6')
+    parser.add_argument('--years', type=int, default=DEFAULT_YEARS, help=f'annual years per country from {START_YEAR}')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=('arrow', 'csv'), default='arrow')
+    parser.add_argument('--out', required=True, help='output file')
+    args = parser.parse_args()
+    write = write_arrow if args.format == 'arrow' else write_csv
+    write(args.out, int(args.rows), args.years, args.seed)
+    print(f'{int(args.rows):,} rows -> {args.out} ({os.path.getsize(args.out) / 2 ** 20:.1f} MB)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+gunicorn settings for wsgi:server; every value can be overridden from the environment.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+    WEB_WORKERS=4 WEB_THREADS=8 gunicorn -c gunicorn.conf.py wsgi:server
+    WEB_WORKER_CLASS=gevent WEB_WORKER_CONNECTIONS=500 gunicorn -c gunicorn.conf.py wsgi:server
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() + 1))
+# 'gthread' (default) runs WEB_THREADS threads per worker; 'gevent' runs
+# WEB_WORKER_CONNECTIONS greenlets per worker and suits slow upstream geocoders.
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', 1000))
+
+# Import wsgi (and so load data and build indexes) once in the master, before
+# forking; WEB_PRELOAD=0 makes every worker load its own copy instead
+preload_app = os.environ.get('WEB_PRELOAD', '1') != '0'
+
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers after this many requests (0 = never) to cap slow leaks
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('WEB_ACCESS_LOG')  # '-' for stdout
+errorlog = '-'
@@ -0,0 +1,283 @@
+"""
+Locust load test for the capstone app.
+
+Each simulated user logs in through the /login form and then mixes the real
+flows: About -> Input -> Output navigation, About page filter changes, coordinate
+submits (queued geocode job, polled until store-data is filled, then the
+Output page render and its map tiles) and filtered downloads. Requests are named after the Dash
+callback they hit, so Locust's statistics are per callback.
+
+    locust -f loadtests/locustfile.py --host http://127.0.0.1:8050 --headless -u 50 -r 10 -t 2m
+
+Set LOCUST_SUMMARY=path.json to also write the per-callback p50/p95/p99 and
+throughput summary printed at the end of the run. loadtests/run_capacity.py
+drives this file across worker counts.
+"""
+import json
+import math
+import os
+import random
+import time
+
+from locust import HttpUser, between, events, task
+
+# The numeric filters on the About page cover the full gapminder range by default
+POP_RANGE = (60011, 1318683096)
+LIFE_EXP_RANGE = (23.599, 82.603)
+COUNTRIES = [
+    'United States', 'India', 'China', 'Brazil', 'Nigeria', 'Germany', 'France',
+    'Japan', 'Mexico', 'Egypt', 'Kenya', 'Australia', 'Canada', 'Argentina',
+]
+# (lat, lon) submits; the Input page default dominates real traffic
+COORDINATES = [(39.0, -79.0)] * 6 + [
+    (48.85, 2.35), (35.68, 139.7), (-23.55, -46.63), (28.61, 77.2), (-1.29, 36.82), (0.0, -30.0),
+]
+# Callback -> a property that only its output spec contains
+CALLBACK_OUTPUTS = {
+    'display_page': 'page-content.children',
+    'fill_about_filters': 'pop-min-input.value',
+    'update_gapminder_table': 'gapminder-table.page_count',
+    'update_download_link': 'download-btn.href',
+    'queue_store_data': 'geocode-job.data',
+    'collect_store_data': 'store-data.data',
+    'update_output': 'display-lat.children',
+}
+MAX_JOB_POLLS = 40
+# The Location Map opens at zoom 5 and its 300px height shows about 3x3 tiles
+MAP_ZOOM = 5
+MAP_TILE_SPAN = 1
+
+
+def _outputs(spec):
+    """
+    Turns a Dash output spec ('a.b' or '..a.b...c.d@hash..') into the request's outputs field.
+    """
+    def one(part):
+        component_id, prop = part.split('.', 1)
+        return {'id': component_id, 'property': prop.split('@')[0]}
+    if spec.startswith('..'):
+        return [one(part) for part in spec[2:-2].split('...')]
+    return one(spec)
+
+
+class CapstoneUser(HttpUser):
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self.client.post('/login', data={'username': 'admin', 'password': 'password'}, name='/login')
+        dependencies = self.client.get('/_dash-dependencies', name='/_dash-dependencies').json()
+        self.callbacks = {}
+        for name, marker in CALLBACK_OUTPUTS.items():
+            self.callbacks[name] = next(
+                d for d in dependencies if marker in d['output'] and not d.get('clientside_function')
+            )
+        self.filters = self.default_filters()
+        self.clientside_table = False
+
+    # Helpers
+
+    def default_filters(self):
+        return {
+            'pop-min-input.value': POP_RANGE[0],
+            'pop-max-input.value': POP_RANGE[1],
+            'lifeexp-min-input.value': LIFE_EXP_RANGE[0],
+            'lifeexp-max-input.value': LIFE_EXP_RANGE[1],
+            'country-dropdown.value': None,
+            'download-format.value': 'csv',
+            'gapminder-table.page_current': 0,
+            'gapminder-table.page_size': 10,
+            'gapminder-table.sort_by': [],
+            'gapminder-table.filter_query': '',
+        }
+
+    def callback(self, name, values, changed):
+        """
+        POSTs one Dash callback, filling inputs/state from values ({'id.prop': value}).
+        Returns the decoded 'response' mapping, or None on failure.
+        """
+        dep = self.callbacks[name]
+
+        def fill(items):
+            return [dict(item, value=values.get(f"{item['id']}.{item['property']}")) for item in items]
+
+        body = {
+            'output': dep['output'],
+            'outputs': _outputs(dep['output']),
+            'inputs': fill(dep['inputs']),
+            'state': fill(dep['state']),
+            'changedPropIds': changed,
+        }
+        with self.client.post('/_dash-update-component', json=body, name=name, catch_response=True) as response:
+            if response.status_code == 204:  # PreventUpdate
+                response.success()
+                return {}
+            if response.status_code != 200:
+                response.failure(f'HTTP {response.status_code}')
+                return None
+            try:
+                return response.json().get('response', {})
+            except ValueError:
+                response.failure('invalid JSON')
+                return None
+
+    def update_table(self):
+        """
+        Does what the About page table does after a change: nothing on the server
+        when it filters clientside, else the query its clientside callback forwards.
+        """
+        if self.clientside_table:
+            return {}
+        f = self.filters
+        query = {
+            'pop_min': f['pop-min-input.value'],
+            'pop_max': f['pop-max-input.value'],
+            'lifeexp_min': f['lifeexp-min-input.value'],
+            'lifeexp_max': f['lifeexp-max-input.value'],
+            'selected_countries': f['country-dropdown.value'],
+            'page_current': f['gapminder-table.page_current'],
+            'page_size': f['gapminder-table.page_size'],
+            'sort_by': f['gapminder-table.sort_by'],
+            'filter_query': f['gapminder-table.filter_query'],
+        }
+        return self.callback('update_gapminder_table', {'gapminder-table-query.data': query},
+                             ['gapminder-table-query.data'])
+
+    def map_tiles(self, lat, lon, zoom=MAP_ZOOM, span=MAP_TILE_SPAN):
+        """
+        GETs the tiles around (lat, lon) that the Location Map loads.
+        """
+        n = 2 ** zoom
+        x = int((lon + 180) / 360 * n)
+        y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+        for dy in range(-span, span + 1):
+            if 0 <= y + dy < n:
+                for dx in range(-span, span + 1):
+                    self.client.get(f'/tiles/{zoom}/{(x + dx) % n}/{y + dy}.png', name='/tiles')
+
+    def navigate(self, pathname):
+        return self.callback('display_page', {'url.pathname': pathname}, ['url.pathname'])
+
+    # Flows
+
+    @task(3)
+    def browse_about(self):
+        self.navigate('/')
+        response = self.callback('fill_about_filters', {}, ['about-init.data'])
+        if response:
+            self.clientside_table = bool(response['gapminder-table-source']['data']['columns'])
+        self.filters = self.default_filters()
+        self.update_table()
+        self.callback('update_download_link', self.filters, ['pop-min-input.value'])
+
+    @task(4)
+    def change_filters(self):
+        changed = random.choice(['pop-min-input.value', 'lifeexp-min-input.value',
+                                 'lifeexp-max-input.value', 'country-dropdown.value',
+                                 'gapminder-table.page_current', 'gapminder-table.sort_by'])
+        if changed == 'pop-min-input.value':
+            self.filters[changed] = random.choice([0, 1000000, 5000000, 20000000])
+        elif changed == 'lifeexp-min-input.value':
+            self.filters[changed] = random.randint(25, 70)
+        elif changed == 'lifeexp-max-input.value':
+            self.filters[changed] = random.randint(50, 83)
+        elif changed == 'country-dropdown.value':
+            self.filters[changed] = random.sample(COUNTRIES, random.randint(0, 3)) or None
+        elif changed == 'gapminder-table.page_current':
+            self.filters[changed] = random.randint(0, 20)
+        else:
+            self.filters[changed] = [{'column_id': random.choice(['pop', 'lifeExp', 'year']),
+                                      'direction': random.choice(['asc', 'desc'])}]
+        self.update_table()
+        if not changed.startswith('gapminder-table.'):
+            self.callback('update_download_link', self.filters, [changed])
+
+    @task(2)
+    def submit_coordinates(self):
+        self.navigate('/input')
+        lat, lon = random.choice(COORDINATES)
+        submit = {
+            'submit-button.n_clicks': 1,
+            'lat-input.value': lat,
+            'lon-input.value': lon,
+            'dataset-select.value': 'gapminder',
+        }
+        response = self.callback('queue_store_data', submit, ['submit-button.n_clicks'])
+        if not response:
+            return
+        job = response['geocode-job']['data']
+        store = None
+        for n in range(1, MAX_JOB_POLLS + 1):
+            time.sleep(0.25)
+            response = self.callback('collect_store_data', {'geocode-poll.n_intervals': n, 'geocode-job.data': job},
+                                     ['geocode-poll.n_intervals'])
+            if response is None:
+                return
+            if 'store-data' in response:
+                store = response['store-data']['data']
+                break
+            if response.get('geocode-poll', {}).get('disabled'):
+                return
+        if store is None:
+            events.request.fire(request_type='JOB', name='collect_store_data timeout', response_time=0,
+                                response_length=0, exception=TimeoutError('geocode job never finished'),
+                                context={})
+            return
+        self.navigate('/output')
+        self.callback('update_output', {'store-data.data': store}, ['store-data.data'])
+        self.map_tiles(lat, lon)
+
+    @task(1)
+    def download(self):
+        params = {
+            'pop_min': self.filters['pop-min-input.value'],
+            'pop_max': self.filters['pop-max-input.value'],
+            'lifeexp_min': self.filters['lifeexp-min-input.value'],
+            'lifeexp_max': self.filters['lifeexp-max-input.value'],
+            'country': self.filters['country-dropdown.value'] or [],
+        }
+        fmt = random.choice(['csv', 'csv', 'csv', 'parquet'])
+        with self.client.get(f'/download/filtered_gapminder.{fmt}', params=params,
+                             name=f'download_filtered [{fmt}]', catch_response=True) as response:
+            if response.status_code != 200 or not response.content:
+                response.failure(f'HTTP {response.status_code}')
+
+
+def summarize(stats):
+    """
+    Per-request-name p50/p95/p99 (ms), request and failure counts, plus totals.
+    """
+    summary = {'callbacks': {}, 'total': {}}
+    for (name, method), entry in sorted(stats.entries.items()):
+        summary['callbacks'][name] = {
+            'method': method,
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'p50_ms': entry.get_response_time_percentile(0.50),
+            'p95_ms': entry.get_response_time_percentile(0.95),
+            'p99_ms': entry.get_response_time_percentile(0.99),
+            'rps': entry.total_rps,
+        }
+    total = stats.total
+    summary['total'] = {
+        'requests': total.num_requests,
+        'failures': total.num_failures,
+        'p50_ms': total.get_response_time_percentile(0.50),
+        'p95_ms': total.get_response_time_percentile(0.95),
+        'p99_ms': total.get_response_time_percentile(0.99),
+        'rps': total.total_rps,
+    }
+    return summary
+
+
+@events.test_stop.add_listener
+def report(environment, **kwargs):
+    summary = summarize(environment.stats)
+    print(f"\n{'callback':<34} {'reqs':>7} {'fail':>5} {'p50':>7} {'p95':>7} {'p99':>7}")
+    for name, row in summary['callbacks'].items():
+        print(f"{name:<34} {row['requests']:>7} {row['failures']:>5} "
+              f"{row['p50_ms']:>7.0f} {row['p95_ms']:>7.0f} {row['p99_ms']:>7.0f}")
+    print(f"throughput: {summary['total']['rps']:.1f} req/s")
+    path = os.environ.get('LOCUST_SUMMARY')
+    if path:
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=2)
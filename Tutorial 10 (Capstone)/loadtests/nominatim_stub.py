@@ -0,0 +1,97 @@
+"""
+Local stand-in for the Nominatim reverse-geocoding API, so load tests run offline.
+
+Answers GET /reverse?lat=..&lon=..&format=json with a Nominatim-shaped body,
+resolving the country with the bundled offline geocoder. --delay-ms adds a
+fixed latency to mimic the public service.
+
+    python loadtests/nominatim_stub.py --port 8089 --delay-ms 150
+
+Point the app at it with:
+
+    GEOCODER_BACKEND=nominatim NOMINATIM_DOMAIN=127.0.0.1:8089 NOMINATIM_SCHEME=http python app.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.geocoder import OfflineGeocoder  # noqa: E402
+
+
+class NominatimStubHandler(BaseHTTPRequestHandler):
+    """
+    Handles /reverse; everything else is a 404.
+    """
+
+    geocoder = None
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/reverse':
+            self._send(404, {'error': 'Not found'})
+            return
+        params = parse_qs(url.query)
+        try:
+            lat = float(params['lat'][0])
+            lon = float(params['lon'][0])
+            polygon = self.geocoder.lookup(lat, lon)
+        except (KeyError, ValueError):
+            self._send(400, {'error': 'Invalid coordinates'})
+            return
+        if self.delay:
+            time.sleep(self.delay)
+        if polygon is None:
+            self._send(200, {'error': 'Unable to geocode'})
+            return
+        self._send(200, {
+            'place_id': abs(hash((round(lat, 4), round(lon, 4)))),
+            'lat': str(lat),
+            'lon': str(lon),
+            'display_name': polygon.country,
+            'address': {'country': polygon.country, 'country_code': (polygon.iso_a2 or '').lower()},
+        })
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output readable
+
+
+def make_server(host='127.0.0.1', port=8089, delay_ms=0.0):
+    """
+    Returns a ready-to-serve stub server (call serve_forever on it).
+    """
+    NominatimStubHandler.geocoder = OfflineGeocoder()
+    NominatimStubHandler.delay = delay_ms / 1000.0
+    return ThreadingHTTPServer((host, port), NominatimStubHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--delay-ms', type=float, default=0.0, help='artificial latency per request')
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.delay_ms)
+    print(f"Nominatim stub listening on http://{args.host}:{args.port}/reverse")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
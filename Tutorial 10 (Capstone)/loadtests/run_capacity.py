@@ -0,0 +1,178 @@
+"""
+Throughput ceiling per worker count.
+
+Starts the Nominatim and map tile stubs, then for each worker count serves the app with that
+many processes (pointed at the stubs, with a scratch tile cache), runs the Locust suite headless against
+it and reads the aggregated statistics. --server picks gunicorn with wsgi.py
+(the production setup) or the Dash development server. Prints requests/s and p50/p95/p99 per
+worker count plus the best throughput seen; per-callback summaries and
+Locust's CSVs land in --out.
+
+Fails (exit code 1) when the aggregated p95 of any run exceeds --p95-ms
+(default LOADTEST_P95_MS, unset = no gate) or when any request failed.
+
+    python loadtests/run_capacity.py --workers 1,2,4 --users 50 --duration 60s
+    python loadtests/run_capacity.py --server dev --workers 1
+"""
+import argparse
+import csv
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+sys.path.insert(0, APP_DIR)
+
+from loadtests import tile_stub  # noqa: E402
+from loadtests.nominatim_stub import make_server  # noqa: E402
+
+# Executed in a fresh interpreter: serve the app the way app.py does (Dash
+# development server, dev tools on, minus the reloader) with N processes. The
+# development server forks one child per request (up to N at once), so data
+# and indexes are loaded up front for every child to inherit.
+SERVE = r'''
+import sys
+import app
+from pages.datasets import registry
+from pages.login import app as dash_app
+for dataset in registry:
+    dataset.df
+    for name in dataset.index_builders:
+        dataset.index(name)
+workers = int(sys.argv[2])
+dash_app.run_server(host='127.0.0.1', port=int(sys.argv[1]), debug=True, use_reloader=False,
+                    processes=workers, threaded=workers == 1)
+'''
+
+
+def wait_until_up(url, timeout=30.0):
+    """
+    Polls url until it answers, raising RuntimeError after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout:.0f}s')
+
+
+def aggregated_stats(csv_prefix):
+    """
+    Returns the 'Aggregated' row of a Locust --csv run as a dict of floats.
+    """
+    with open(f'{csv_prefix}_stats.csv', newline='') as f:
+        for row in csv.DictReader(f):
+            if row['Name'] == 'Aggregated':
+                return {
+                    'requests': int(row['Request Count']),
+                    'failures': int(row['Failure Count']),
+                    'rps': float(row['Requests/s']),
+                    'p50_ms': float(row['50%']),
+                    'p95_ms': float(row['95%']),
+                    'p99_ms': float(row['99%']),
+                }
+    raise ValueError(f'no Aggregated row in {csv_prefix}_stats.csv')
+
+
+def run(workers, args):
+    """
+    Serves the app with `workers` processes and load-tests it; returns the aggregated stats.
+    """
+    # A cold scratch tile cache per run, so stub tiles never reach the real one
+    tile_dir = tempfile.TemporaryDirectory(prefix='loadtest-tiles-')
+    env = dict(
+        os.environ,
+        GEOCODER_BACKEND='nominatim',
+        NOMINATIM_DOMAIN=f'127.0.0.1:{args.stub_port}',
+        NOMINATIM_SCHEME='http',
+        TILE_UPSTREAM=f'http://127.0.0.1:{args.tile_stub_port}/{{z}}/{{x}}/{{y}}.png',
+        TILE_CACHE_DIR=tile_dir.name,
+    )
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:server']
+        env.update(WEB_WORKERS=str(workers), WEB_BIND=f'127.0.0.1:{args.port}',
+                   SECRET_KEY=os.environ.get('SECRET_KEY') or secrets.token_hex(32))
+    else:
+        command = [sys.executable, '-c', SERVE, str(args.port), str(workers)]
+    server = subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    host = f'http://127.0.0.1:{args.port}'
+    csv_prefix = os.path.join(args.out, f'{args.server}_workers_{workers}')
+    try:
+        wait_until_up(f'{host}/login', timeout=60)
+        subprocess.run(
+            [sys.executable, '-m', 'locust', '-f', os.path.join(HERE, 'locustfile.py'), '--headless',
+             '-u', str(args.users), '-r', str(args.spawn_rate), '-t', args.duration,
+             '--host', host, '--csv', csv_prefix, '--only-summary'],
+            cwd=APP_DIR, check=False,
+            env=dict(os.environ, LOCUST_SUMMARY=f'{csv_prefix}_summary.json'),
+        )
+    finally:
+        server.terminate()
+        server.wait()
+        tile_dir.cleanup()
+    return aggregated_stats(csv_prefix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('gunicorn', 'dev'), default='gunicorn')
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated worker process counts')
+    parser.add_argument('--users', type=int, default=50, help='concurrent Locust users')
+    parser.add_argument('--spawn-rate', type=float, default=10)
+    parser.add_argument('--duration', default='60s', help='Locust run time per worker count')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--stub-port', type=int, default=8089)
+    parser.add_argument('--stub-delay-ms', type=float, default=150, help='simulated Nominatim latency')
+    parser.add_argument('--tile-stub-port', type=int, default=8090)
+    parser.add_argument('--tile-stub-delay-ms', type=float, default=80, help='simulated tile server latency')
+    parser.add_argument('--p95-ms', type=float, default=os.environ.get('LOADTEST_P95_MS'),
+                        help='fail when the aggregated p95 exceeds this')
+    parser.add_argument('--out', default=os.path.join(HERE, 'results'), help='directory for CSVs and summaries')
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    stub = make_server('127.0.0.1', args.stub_port, args.stub_delay_ms)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    tiles = tile_stub.make_server('127.0.0.1', args.tile_stub_port, args.tile_stub_delay_ms)
+    threading.Thread(target=tiles.serve_forever, daemon=True).start()
+
+    results = {}
+    try:
+        for workers in (int(n) for n in args.workers.split(',')):
+            results[workers] = run(workers, args)
+    finally:
+        stub.shutdown()
+        tiles.shutdown()
+
+    print(f"\n{'workers':>7} {'req/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'fail':>6}")
+    for workers, row in results.items():
+        print(f"{workers:>7} {row['rps']:>8.1f} {row['p50_ms']:>7.0f} {row['p95_ms']:>7.0f} "
+              f"{row['p99_ms']:>7.0f} {row['failures']:>6}")
+    best = max(results, key=lambda w: results[w]['rps'])
+    print(f"\nthroughput ceiling: {results[best]['rps']:.1f} req/s at {best} worker(s)")
+    with open(os.path.join(args.out, f'{args.server}_capacity.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+
+    status = 0
+    for workers, row in results.items():
+        if row['failures']:
+            print(f"FAIL: {row['failures']} failed requests with {workers} worker(s)")
+            status = 1
+        if args.p95_ms is not None and row['p95_ms'] > float(args.p95_ms):
+            print(f"FAIL: p95 {row['p95_ms']:.0f} ms exceeds {float(args.p95_ms):.0f} ms with {workers} worker(s)")
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
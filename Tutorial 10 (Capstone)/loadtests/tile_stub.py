@@ -0,0 +1,96 @@
+"""
+Local stand-in for an XYZ map tile server, so the tile proxy runs offline.
+
+Answers GET /{z}/{x}/{y}.png with a plain 256x256 PNG tile (404 outside the
+tile grid). --delay-ms adds a fixed latency to mimic the public servers.
+
+    python loadtests/tile_stub.py --port 8090 --delay-ms 80
+
+Point the app at it with:
+
+    TILE_UPSTREAM='http://127.0.0.1:8090/{z}/{x}/{y}.png' python app.py
+"""
+import argparse
+import re
+import struct
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TILE_SIZE = 256
+_TILE = re.compile(r'^/(\d+)/(\d+)/(\d+)\.png$')
+
+
+def solid_png(rgb, size=TILE_SIZE):
+    """
+    Returns a size x size PNG of one colour.
+    """
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    row = b'\x00' + bytes(rgb) * size  # Filter type 0, then the pixels
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * size, 9))
+            + chunk(b'IEND', b''))
+
+
+class TileStubHandler(BaseHTTPRequestHandler):
+    """
+    Handles /{z}/{x}/{y}.png; everything else is a 404.
+    """
+
+    tiles = ()
+    delay = 0.0
+    requests = 0
+
+    def do_GET(self):
+        match = _TILE.match(self.path)
+        if not match:
+            self._send(404, b'Not found', 'text/plain')
+            return
+        z, x, y = (int(n) for n in match.groups())
+        if not (x < 2 ** z and y < 2 ** z):
+            self._send(404, b'Not found', 'text/plain')
+            return
+        if self.delay:
+            time.sleep(self.delay)
+        TileStubHandler.requests += 1
+        # Checkerboard, so the map shows where each tile lands
+        self._send(200, self.tiles[(x + y) % 2], 'image/png')
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output readable
+
+
+def make_server(host='127.0.0.1', port=8090, delay_ms=0.0):
+    """
+    Returns a ready-to-serve stub server (call serve_forever on it).
+    """
+    TileStubHandler.tiles = (solid_png((242, 239, 233)), solid_png((226, 222, 214)))
+    TileStubHandler.delay = delay_ms / 1000.0
+    return ThreadingHTTPServer((host, port), TileStubHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--delay-ms', type=float, default=0.0, help='artificial latency per request')
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.delay_ms)
+    print(f"Tile stub listening on http://{args.host}:{args.port}/{{z}}/{{x}}/{{y}}.png")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,130 +1,165 @@
-import dash
-from dash import dcc, html, Input, Output, State, callback
-import dash_bootstrap_components as dbc
-import dash_daq as daq
-import pandas as pd
-import plotly.express as px
-from flask import redirect, url_for, request, session, flash
-from geopy.geocoders import Nominatim  # For reverse geocoding
+import os
+from functools import lru_cache
+
+from dash import dcc, html
 import dash.dash_table as dt
-import pages.login
-from pages.login import gapminder_df
 from pages.login import dbc
 
+# Milliseconds the numeric filters wait after the last keystroke before firing their callbacks
+FILTER_DEBOUNCE_MS = int(os.environ.get('FILTER_DEBOUNCE_MS', 400))
+
 # About Page Layout 
-about_layout = dbc.Container([
-    dbc.Row([
-        dbc.Col(html.H1("Introduction to GapMinder", className="text-center mb-4"), width=12)
-    ]),
-    dbc.Row([
-        dbc.Col([
-            html.P("This application visualizes socio-economic indicators from the GapMinder dataset.",
-                   className="lead"),
-            html.Hr(),
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4("Features:", className="card-title"),
-                    html.Ul([
-                        html.Li("Interactive data visualization"),
-                        html.Li("Multi-year historical trends"),
-                        html.Li("Country-specific metrics")
+@lru_cache(maxsize=1)
+def about_layout():
+    """
+    Builds the About page skeleton. It holds no data: filter defaults and
+    country options are filled in by fill_about_filters, so the serialized
+    skeleton can be cached by pages/layout_cache.py.
+    """
+    return dbc.Container([
+        dcc.Store(id='about-init'),  # Triggers fill_about_filters when the page is shown
+        dcc.Store(id='gapminder-table-delta'),  # Token of the table rows last sent, see pages/delta.py
+        dcc.Store(id='gapminder-table-source'),  # Columnar copy of small datasets for clientside filtering
+        dcc.Store(id='gapminder-table-query'),  # Filters handed to update_gapminder_table on the server path
+        dbc.Row([
+            dbc.Col(html.H1("Introduction to GapMinder", className="text-center mb-4"), width=12)
+        ]),
+        dbc.Row([
+            dbc.Col([
+                html.P("This application visualizes socio-economic indicators from the GapMinder dataset.",
+                       className="lead"),
+                html.Hr(),
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4("Features:", className="card-title"),
+                        html.Ul([
+                            html.Li("Interactive data visualization"),
+                            html.Li("Multi-year historical trends"),
+                            html.Li("Country-specific metrics")
+                        ])
                     ])
+                ]),
+                html.Div(className="mt-4", children=[
+                    dbc.Button("Get Started", href="/input", color="primary", className="mr-2"),
+                    dbc.Button("View Output", href="/output", color="secondary")
                 ])
-            ]),
-            html.Div(className="mt-4", children=[
-                dbc.Button("Get Started", href="/input", color="primary", className="mr-2"),
-                dbc.Button("View Output", href="/output", color="secondary")
-            ])
-        ], width=8, className="mx-auto")
-    ]),
+            ], width=8, className="mx-auto")
+        ]),
 
-    # Filter Controls using Greater Than / Less Than Inputs
-    dbc.Row([
-        dbc.Col([
-            html.H5("Filter Options", className="mb-3"),
-            
-            # Population Filter
-            dbc.Label("Population Filter:"),
-            dbc.Row([
-                dbc.Col([
-                    dbc.Label("Minimum Population:"),
-                    dbc.Input(
-                        id='pop-min-input', 
-                        type='number', 
-                        value=int(gapminder_df['pop'].min())
-                    )
-                ], md=6),
-                dbc.Col([
-                    dbc.Label("Maximum Population:"),
-                    dbc.Input(
-                        id='pop-max-input', 
-                        type='number', 
-                        value=int(gapminder_df['pop'].max())
-                    )
-                ], md=6)
-            ]),
-            html.Br(),
+        # Filter Controls using Greater Than / Less Than Inputs
+        dbc.Row([
+            dbc.Col([
+                html.H5("Filter Options", className="mb-3"),
 
-            # Life Expectancy Filter
-            dbc.Label("Life Expectancy Filter:"),
-            dbc.Row([
-                dbc.Col([
-                    dbc.Label("Minimum Life Expectancy:"),
-                    dbc.Input(
-                        id='lifeexp-min-input', 
-                        type='number', 
-                        value=gapminder_df['lifeExp'].min()
-                    )
-                ], md=6),
-                dbc.Col([
-                    dbc.Label("Maximum Life Expectancy:"),
-                    dbc.Input(
-                        id='lifeexp-max-input', 
-                        type='number', 
-                        value=gapminder_df['lifeExp'].max()
-                    )
-                ], md=6)
-            ]),
-            html.Br(),
+                # Population Filter
+                dbc.Label("Population Filter:"),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Minimum Population:"),
+                        dbc.Input(
+                            id='pop-min-input', 
+                            type='number', 
+                            value=None,
+                            debounce=FILTER_DEBOUNCE_MS
+                        )
+                    ], md=6),
+                    dbc.Col([
+                        dbc.Label("Maximum Population:"),
+                        dbc.Input(
+                            id='pop-max-input', 
+                            type='number', 
+                            value=None,
+                            debounce=FILTER_DEBOUNCE_MS
+                        )
+                    ], md=6)
+                ]),
+                html.Br(),
 
-            # Country dropdown (multi-select)
-            dbc.Label("Country:"),
-            dcc.Dropdown(
-                id='country-dropdown',
-                options=[{'label': c, 'value': c} for c in sorted(gapminder_df['country'].unique())],
-                multi=True,
-                placeholder="Select one or more countries"
-            ),
-            html.Br(),
+                # Life Expectancy Filter
+                dbc.Label("Life Expectancy Filter:"),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Minimum Life Expectancy:"),
+                        dbc.Input(
+                            id='lifeexp-min-input', 
+                            type='number', 
+                            value=None,
+                            debounce=FILTER_DEBOUNCE_MS
+                        )
+                    ], md=6),
+                    dbc.Col([
+                        dbc.Label("Maximum Life Expectancy:"),
+                        dbc.Input(
+                            id='lifeexp-max-input', 
+                            type='number', 
+                            value=None,
+                            debounce=FILTER_DEBOUNCE_MS
+                        )
+                    ], md=6)
+                ]),
+                html.Br(),
 
-            # Download button + Download component
-            dbc.Button("Download Filtered CSV", id='download-btn', color="info"),
-            dcc.Download(id='download-dataframe-csv'),
-        ], width=12)
-    ], className="mt-4"),
+                # Country dropdown (multi-select)
+                dbc.Label("Country:"),
+                dcc.Dropdown(
+                    id='country-dropdown',
+                    options=[],
+                    multi=True,
+                    placeholder="Select one or more countries"
+                ),
+                html.Br(),
+
+                # Download button, pointed at the streaming export route by update_download_link
+                dbc.Row([
+                    dbc.Col(
+                        dbc.Select(
+                            id='download-format',
+                            options=[
+                                {'label': 'CSV', 'value': 'csv'},
+                                {'label': 'Parquet', 'value': 'parquet'},
+                                {'label': 'Arrow IPC', 'value': 'arrow'},
+                                {'label': 'Feather', 'value': 'feather'}
+                            ],
+                            value='csv'
+                        ), width="auto"
+                    ),
+                    dbc.Col(
+                        dbc.Button("Download Filtered Data", id='download-btn', color="info",
+                                   href="/download/filtered_gapminder.csv", external_link=True),
+                        width="auto"
+                    )
+                ], className="g-2"),
+            ], width=12)
+        ], className="mt-4"),
 
-    # DataTable
-    dbc.Row([
-        dbc.Col([
-            html.H3("Explore Countries", className="text-center mt-5 mb-3"),
-            dt.DataTable(
-                id='gapminder-table',
-                columns=[
-                    {'name': 'Country', 'id': 'country'},
-                    {'name': 'Continent', 'id': 'continent'},
-                    {'name': 'Year', 'id': 'year'},
-                    {'name': 'Population', 'id': 'pop'},
-                    {'name': 'Life Expectancy', 'id': 'lifeExp'},
-                ],
-                data=gapminder_df.to_dict('records'),
-                filter_action='native',  # Built-in filter 
-                sort_action='native',
-                page_size=10,
-                style_table={'overflowX': 'auto'},
-                style_cell={'textAlign': 'left'}
-            )
-        ], width=12)
-    ])
-], className="mt-5")
+        # DataTable
+        dbc.Row([
+            dbc.Col([
+                html.H3("Explore Countries", className="text-center mt-5 mb-3"),
+                dt.DataTable(
+                    id='gapminder-table',
+                    columns=[
+                        {'name': 'Country', 'id': 'country'},
+                        {'name': 'Continent', 'id': 'continent'},
+                        {'name': 'Year', 'id': 'year', 'type': 'numeric'},
+                        {'name': 'Population', 'id': 'pop', 'type': 'numeric'},
+                        {'name': 'Life Expectancy', 'id': 'lifeExp', 'type': 'numeric'},
+                    ],
+                    # Paging, filtering and sorting run on the server (update_gapminder_table),
+                    # so only the visible page is sent to the browser. fill_about_filters
+                    # switches them to native when the data is small enough to filter clientside.
+                    page_action='custom',
+                    filter_action='custom',
+                    sort_action='custom',
+                    filter_query='',
+                    sort_by=[],
+                    page_current=0,
+                    page_size=10,
+                    style_table={'overflowX': 'auto'},
+                    style_cell={'textAlign': 'left'}
+                )
+            ], width=12)
+        ])
+    ], className="mt-5")
 
 
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from dash.exceptions import PreventUpdate
+
+from pages.jobs import session_id
+from pages.metrics import metrics
+
+# Request coalescing settings (overridable through the environment)
+COALESCE_CALLBACKS = os.environ.get('COALESCE_CALLBACKS', '1') != '0'
+COALESCE_MAX_ENTRIES = int(os.environ.get('COALESCE_MAX_ENTRIES', 1000))  # (session, callback) pairs remembered
+
+metrics.describe('dash_callbacks_superseded_total', 'counter',
+                 'Callback requests dropped for a newer one from the same session, by stage.')
+
+
+class _Slot:
+    def __init__(self):
+        self.latest = 0
+        self.lock = threading.Lock()
+
+
+class RequestCoalescer:
+    """
+    Drops callback requests that a newer request for the same callback from
+    the same session has made pointless.
+
+    Every request takes a ticket when it arrives. Requests for one (session,
+    callback) pair then run one at a time, and one whose ticket is no longer
+    the newest when its turn comes is answered with PreventUpdate without
+    running. A request already running gives up at its next ``check``, so a
+    burst of filter changes costs roughly one full run, for the last state.
+    The browser ignores responses for superseded requests anyway.
+
+    Tickets live in this worker process only; requests from one session that
+    land on different workers are not coalesced with each other, and requests
+    without a stored session are never coalesced.
+    """
+
+    def __init__(self, max_entries=COALESCE_MAX_ENTRIES, enabled=COALESCE_CALLBACKS):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._slots = OrderedDict()  # (session id, callback name) -> _Slot
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _ticket(self, key):
+        with self._lock:
+            slot = self._slots.pop(key, None) or _Slot()
+            self._slots[key] = slot
+            while len(self._slots) > self.max_entries:
+                self._slots.popitem(last=False)
+            slot.latest += 1
+            return slot, slot.latest
+
+    def _drop(self, name, stage):
+        metrics.inc('dash_callbacks_superseded_total', callback=name, stage=stage)
+        raise PreventUpdate
+
+    def coalesced(self, name):
+        """
+        Decorator making the callback `name` skip requests superseded before or while they run.
+        """
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                sid = session_id()
+                if not self.enabled or sid is None:
+                    return fn(*args, **kwargs)
+                slot, ticket = self._ticket((sid, name))
+                with slot.lock:
+                    if slot.latest != ticket:
+                        self._drop(name, 'queued')
+                    self._local.current = (name, slot, ticket)
+                    try:
+                        return fn(*args, **kwargs)
+                    finally:
+                        self._local.current = None
+            return wrapper
+        return decorate
+
+    def check(self):
+        """
+        Raises PreventUpdate if the coalesced callback running in this thread has
+        been superseded; call between expensive steps. A no-op anywhere else.
+        """
+        current = getattr(self._local, 'current', None)
+        if current is not None and current[1].latest != current[2]:
+            self._drop(current[0], 'running')
+
+
+request_coalescer = RequestCoalescer()
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+# Dataset compaction settings (overridable through the environment)
+DATASET_COMPACT = os.environ.get('DATASET_COMPACT', '1') != '0'
+# Relative error accepted for storing a float64 column as float32; 0 keeps only exact conversions
+DATASET_FLOAT_TOLERANCE = float(os.environ.get('DATASET_FLOAT_TOLERANCE', 0))
+# Text columns become categorical when their distinct values are at most this share of the rows
+DATASET_CATEGORY_RATIO = float(os.environ.get('DATASET_CATEGORY_RATIO', 0.5))
+
+
+def _compact_column(series, float_tolerance, category_ratio):
+    """
+    Returns the smallest form of series that holds the same values, or series itself.
+    """
+    import pandas as pd
+    dtype = series.dtype
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        if len(series) and series.nunique(dropna=False) <= category_ratio * len(series):
+            return series.astype('category')
+        return series
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer' if dtype.kind == 'i' else 'unsigned')
+    if dtype == np.float64:
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        if np.isinf(narrow[np.isfinite(values)]).any():
+            return series  # Out of float32 range
+        if float_tolerance > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                error = np.abs(narrow.astype(np.float64) - values) / np.abs(values)
+            ok = bool(np.all(np.isnan(error) | (error <= float_tolerance)))
+        else:
+            ok = np.array_equal(narrow.astype(np.float64), values, equal_nan=True)
+        return series.astype(np.float32) if ok else series
+    return series
+
+
+def compact_frame(df, float_tolerance=DATASET_FLOAT_TOLERANCE, category_ratio=DATASET_CATEGORY_RATIO):
+    """
+    Returns (frame, report): df with repetitive text columns made categorical,
+    integers downcast to the smallest type holding their range and float64
+    columns stored as float32 where that is exact (or within float_tolerance,
+    relative). Columns that change nothing are kept as they are, so already
+    compact (e.g. memory-mapped) columns are not copied.
+
+    report holds the deep memory use before and after, in total and per changed column.
+    """
+    before = df.memory_usage(deep=True, index=False)
+    changed = {}
+    for col in df.columns:
+        series = _compact_column(df[col], float_tolerance, category_ratio)
+        if series.dtype != df[col].dtype:
+            changed[col] = series
+    compact = df
+    if changed:
+        compact = df.copy(deep=False)
+        for col, series in changed.items():
+            compact[col] = series
+    after = compact.memory_usage(deep=True, index=False)
+    report = {
+        'before': int(before.sum()),
+        'after': int(after.sum()),
+        'columns': {
+            col: {
+                'from': str(df[col].dtype),
+                'to': str(series.dtype),
+                'before': int(before[col]),
+                'after': int(after[col]),
+            }
+            for col, series in changed.items()
+        },
+    }
+    return compact, report
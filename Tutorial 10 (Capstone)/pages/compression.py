@@ -0,0 +1,203 @@
+import os
+import pkgutil
+import sys
+import threading
+import zlib
+
+from flask import request
+
+from pages.geocoder import DATA_DIR
+from pages.metrics import metrics
+
+# Response compression settings (overridable through the environment)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))  # Smaller bodies go out as-is
+COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))  # Per-response work, keep it cheap
+COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+# Component bundles precompressed at full quality, once per package version
+COMPRESS_STATIC_DIR = os.environ.get('COMPRESS_STATIC_DIR', os.path.join(DATA_DIR, 'cache', 'static'))
+COMPRESS_STATIC_BROTLI_QUALITY = int(os.environ.get('COMPRESS_STATIC_BROTLI_QUALITY', 11))
+
+# Only text-like bodies; the columnar downloads carry their own compression
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+
+metrics.describe('http_compressed_responses_total', 'counter', 'Responses sent compressed, by encoding.')
+metrics.describe('http_compression_bytes_in_total', 'counter', 'Body bytes before compression, by encoding.')
+metrics.describe('http_compression_bytes_saved_total', 'counter', 'Body bytes saved by compression, by encoding.')
+
+
+def negotiate(accept_encodings):
+    """
+    Returns 'br', 'gzip' or None for a request's Accept-Encoding.
+    """
+    for encoding in ('br', 'gzip'):
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(data, encoding, quality=None):
+    """
+    Compresses a whole body.
+    """
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY if quality is None else quality)
+    compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL if quality is None else quality, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, on_done=None):
+    """
+    Compresses a streamed body chunk by chunk; on_done(bytes_in, bytes_out) runs at the end.
+    """
+    if encoding == 'br':
+        import brotli
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    bytes_in = bytes_out = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            bytes_in += len(chunk)
+            data = process(chunk)
+            if data:
+                bytes_out += len(data)
+                yield data
+        data = finish()
+        bytes_out += len(data)
+        yield data
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    if on_done is not None:
+        on_done(bytes_in, bytes_out)
+
+
+class ResponseCompressor:
+    """
+    Brotli/gzip compression for Dash's JSON endpoints, the download routes and
+    the component bundles, negotiated from Accept-Encoding.
+
+    Dynamic bodies under COMPRESS_MIN_BYTES are sent as-is, since headers and
+    CPU would cost more than the bytes saved. Streamed downloads are compressed
+    chunk by chunk. The JavaScript bundles under _dash-component-suites only
+    change with their package version, so ``precompress`` writes full-quality
+    copies of every bundle to COMPRESS_STATIC_DIR (wsgi.py does this before
+    forking); bundles requested before that are compressed once at the cheap
+    dynamic settings. Either way each is then served from memory.
+    """
+
+    def __init__(self, min_bytes=COMPRESS_MIN_BYTES, static_dir=COMPRESS_STATIC_DIR):
+        self.min_bytes = min_bytes
+        self.static_dir = static_dir
+        self._static = {}  # (package, path, encoding) -> compressed bytes
+        self._lock = threading.Lock()
+
+    def _record(self, encoding, bytes_in, bytes_out):
+        metrics.inc('http_compressed_responses_total', encoding=encoding)
+        metrics.inc('http_compression_bytes_in_total', bytes_in, encoding=encoding)
+        metrics.inc('http_compression_bytes_saved_total', bytes_in - bytes_out, encoding=encoding)
+
+    def _static_file(self, package, path, encoding):
+        version = getattr(sys.modules.get(package), '__version__', '0')
+        name = f'{package}-{version}-{path}'.replace('/', '_')
+        return os.path.join(self.static_dir, f"{name}.{'br' if encoding == 'br' else 'gz'}")
+
+    def static_bundle(self, package, path, data, encoding):
+        """
+        Returns the compressed copy of a component bundle: from memory, from
+        COMPRESS_STATIC_DIR, or compressed now at the dynamic settings.
+        """
+        key = (package, path, encoding)
+        compressed = self._static.get(key)
+        if compressed is None:
+            try:
+                with open(self._static_file(package, path, encoding), 'rb') as f:
+                    compressed = f.read()
+            except OSError:
+                compressed = compress(data, encoding)
+            with self._lock:
+                self._static[key] = compressed
+        return compressed
+
+    def precompress(self, app):
+        """
+        Writes full-quality Brotli and gzip copies of every registered .js/.css
+        bundle that has none yet, and loads all of them into memory. Returns
+        the number of files written.
+        """
+        with app.server.test_request_context(app.config.routes_pathname_prefix):
+            app.index()  # Registers the bundle paths Dash will serve
+        os.makedirs(self.static_dir, exist_ok=True)
+        written = 0
+        for package, paths in app.registered_paths.items():
+            for path in paths:
+                if not path.endswith(('.js', '.css')):
+                    continue
+                data = None
+                for encoding in ('br', 'gzip'):
+                    target = self._static_file(package, path, encoding)
+                    if not os.path.exists(target):
+                        if data is None:
+                            data = pkgutil.get_data(package, path)
+                        quality = COMPRESS_STATIC_BROTLI_QUALITY if encoding == 'br' else 9
+                        tmp = f'{target}.{os.getpid()}.tmp'
+                        with open(tmp, 'wb') as f:
+                            f.write(compress(data, encoding, quality))
+                        os.replace(tmp, target)
+                        written += 1
+                    with self._lock:
+                        self._static.pop((package, path, encoding), None)
+                    self.static_bundle(package, path, None, encoding)
+        return written
+
+    def install(self, app, paths=()):
+        """
+        Compresses responses on app's Flask server for Dash's endpoints plus any
+        extra path prefixes (the download routes).
+        """
+        from dash.fingerprint import check_fingerprint
+        prefix = app.config.routes_pathname_prefix
+        dynamic = (prefix + '_dash-update-component', prefix + '_dash-layout', prefix + '_dash-dependencies') + tuple(paths)
+        static = prefix + '_dash-component-suites/'
+
+        @app.server.after_request
+        def compress_response(response):
+            is_static = request.path.startswith(static)
+            if not is_static and not request.path.startswith(dynamic):
+                return response
+            response.vary.add('Accept-Encoding')
+            if response.status_code != 200 or 'Content-Encoding' in response.headers:
+                return response
+            if not response.mimetype.startswith(COMPRESSIBLE_TYPES):
+                return response
+            encoding = negotiate(request.accept_encodings)
+            if encoding is None:
+                return response
+            if response.is_streamed:
+                response.response = compress_stream(
+                    response.response, encoding, lambda n_in, n_out: self._record(encoding, n_in, n_out)
+                )
+                response.headers.pop('Content-Length', None)
+            else:
+                data = response.get_data()
+                if len(data) < self.min_bytes:
+                    return response
+                if is_static:
+                    path, _ = check_fingerprint(request.view_args['fingerprinted_path'])
+                    compressed = self.static_bundle(request.view_args['package_name'], path, data, encoding)
+                else:
+                    compressed = compress(data, encoding)
+                self._record(encoding, len(data), len(compressed))
+                response.set_data(compressed)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        return compress_response
+
+
+response_compressor = ResponseCompressor()
@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def group_rows(df, key='country'):
+    """
+    Returns df reordered (stably) so that all rows of each key value are contiguous.
+    Frames that are already grouped, like the gapminder CSV, come back untouched.
+    """
+    import pandas as pd
+    codes, _ = pd.factorize(df[key], sort=False)
+    # Grouped iff every code appears in exactly one run
+    runs = np.count_nonzero(np.diff(codes)) + 1 if len(codes) else 0
+    if runs == len(np.unique(codes)):
+        return df
+    order = np.argsort(codes, kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+
+class CountryIndex:
+    """
+    Per-country row index over a frame whose rows are grouped by country.
+
+    Each country maps to a contiguous slice, so a lookup is one dict access
+    and ``df.iloc[slice]`` returns the country's rows without scanning or
+    copying the frame. Per-country aggregates live in CountrySummary.
+    """
+
+    def __init__(self, df, key='country'):
+        self.df = df
+        self.slices = {}
+        values = df[key].to_numpy()
+        if len(values):
+            starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+            stops = np.append(starts[1:], len(values))
+            for start, stop in zip(starts, stops):
+                name = values[start]
+                if name in self.slices:
+                    raise ValueError(f"Rows for {name!r} are not contiguous; pass the frame through group_rows first.")
+                self.slices[name] = slice(int(start), int(stop))
+
+    def __contains__(self, country):
+        return country in self.slices
+
+    def rows(self, country):
+        """
+        Returns the row slice for a country, or None if it is not in the data.
+        """
+        return self.slices.get(country)
+
+    def frame(self, country):
+        """
+        Returns the country's rows as a DataFrame slice, or None.
+        """
+        rows = self.slices.get(country)
+        return None if rows is None else self.df.iloc[rows]
+
+
+class CountrySummary:
+    """
+    Materialized per-country aggregates for the Output page's Country Data card.
+
+    Built in one vectorized pass over a frame grouped by country (each
+    aggregate is a ufunc.reduceat over the country runs): total GDP
+    (sum of pop * gdpPercap), total population, mean life expectancy, first
+    and last year, and the min/max of each metric. Missing values are skipped.
+    Registered as a dataset index, so it is rebuilt whenever the dataset is
+    reloaded. ``table`` holds the result as a DataFrame indexed by country.
+    """
+
+    METRICS = ('pop', 'lifeExp', 'gdpPercap')
+
+    def __init__(self, df, key='country'):
+        import pandas as pd
+        keys = df[key].to_numpy()
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1)) if len(keys) else np.empty(0, np.intp)
+        columns = {}
+        values = {m: df[m].to_numpy(dtype=np.float64) for m in self.METRICS}
+        gdp = values['pop'] * values['gdpPercap']
+        if len(starts):
+            # Summed in extended precision: the run-by-run reduceat order loses cents on large totals
+            columns['total_gdp'] = np.add.reduceat(np.nan_to_num(gdp).astype(np.longdouble), starts).astype(np.float64)
+            columns['total_pop'] = np.add.reduceat(np.nan_to_num(values['pop']), starts)
+            life = values['lifeExp']
+            counted = np.add.reduceat(~np.isnan(life), starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                columns['mean_lifeExp'] = np.add.reduceat(np.nan_to_num(life), starts) / counted
+            years = df['year'].to_numpy()
+            columns['first_year'] = np.minimum.reduceat(years, starts)
+            columns['last_year'] = np.maximum.reduceat(years, starts)
+            for m in self.METRICS:
+                columns[f'min_{m}'] = np.fmin.reduceat(values[m], starts)
+                columns[f'max_{m}'] = np.fmax.reduceat(values[m], starts)
+        self.table = pd.DataFrame(columns, index=pd.Index(keys[starts], name=key))
+        if not self.table.index.is_unique:
+            raise ValueError(f"Rows for some {key} values are not contiguous; pass the frame through group_rows first.")
+        self._rows = self.table.to_dict('index')
+
+    def __contains__(self, country):
+        return country in self._rows
+
+    def row(self, country):
+        """
+        Returns the country's aggregates as a dict, or None if it is not in the data.
+        """
+        return self._rows.get(country)
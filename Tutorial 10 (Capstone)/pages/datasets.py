@@ -0,0 +1,356 @@
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+from pages.compact import DATASET_COMPACT, compact_frame
+from pages.country_index import CountryIndex, CountrySummary, group_rows
+from pages.figure_cache import frame_version
+from pages.geocoder import DATA_DIR
+from pages.metrics import metrics
+from pages.query_engine import QueryEngine
+
+# Arrow IPC copies of loaded datasets, memory-mapped on later loads
+DATASET_CACHE_DIR = os.environ.get('DATASET_CACHE_DIR', os.path.join(DATA_DIR, 'cache'))
+# How often a loaded dataset's source files are checked for changes, in seconds.
+# 0 turns the check off, and the Arrow copy is then trusted as it is.
+DATASET_CHECK_SECONDS = float(os.environ.get('DATASET_CHECK_SECONDS', 30))
+
+# Arrow schema metadata key holding the source fingerprint a cached copy was written from
+SOURCE_KEY = b'dataset_source'
+# ... and the compaction report of the load that wrote it, as JSON
+MEMORY_KEY = b'dataset_memory'
+
+metrics.describe('dataset_memory_bytes', 'gauge', 'Deep memory use of a loaded dataset before and after compaction.')
+
+
+class Dataset:
+    """
+    One registered dataset: how to load it, what it must look like, and the
+    indexes built from it.
+
+    Nothing is loaded until ``df`` (or an index) is first used. The first load
+    calls ``loader``, checks the frame against ``schema`` ({column: dtype}) and
+    writes it to an uncompressed Arrow IPC file under DATASET_CACHE_DIR. Later
+    loads, in this or any other worker, memory-map that file so numeric
+    columns are backed by shared page-cache pages instead of private copies.
+    Unless ``compact`` is off, the validated frame is first shrunk by
+    pages/compact.py (categorical text, narrow numeric types); ``memory``
+    reports what that saved. The report is stored with the Arrow copy, so
+    loads from the already compact copy report the original savings too.
+
+    ``source`` returns the path(s) the loader reads. Their size and mtime are
+    stored with the Arrow copy, which is rebuilt when they no longer match;
+    a loaded frame re-checks them at most every DATASET_CHECK_SECONDS and
+    reloads itself (dropping its indexes) when they changed.
+
+    ``indexes`` maps an index name to a builder called with the frame; each
+    index is built on first use and dropped by ``reload``. ``plot`` holds the
+    px.scatter arguments the Output page uses for datasets without a
+    country view.
+    """
+
+    def __init__(self, name, label, loader, schema, indexes=None, plot=None, cache=True, compact=DATASET_COMPACT,
+                 source=None, check_seconds=DATASET_CHECK_SECONDS):
+        self.name = name
+        self.label = label
+        self.loader = loader
+        self.source = source
+        self.check_seconds = check_seconds
+        self.schema = schema
+        self.index_builders = indexes or {}
+        self.plot = plot
+        self.cache = cache
+        self.compact = compact
+        self.memory = None  # compact_frame report of the last load
+        self.generation = 0  # Bumped by every reload
+        self._lock = threading.RLock()
+        self._df = None
+        self._version = None
+        self._indexes = {}
+        self._fingerprint = None  # Source fingerprint of the loaded frame
+        self._next_check = 0.0
+
+    @property
+    def loaded(self):
+        return self._df is not None
+
+    @property
+    def cache_path(self):
+        return os.path.join(DATASET_CACHE_DIR, f'{self.name}.arrow')
+
+    @property
+    def df(self):
+        if self._df is not None and self.check_seconds > 0 and time.monotonic() >= self._next_check:
+            self.check_source()
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    self._df = self._load()
+        return self._df
+
+    @property
+    def version(self):
+        """
+        Content fingerprint of the loaded frame; changes whenever the data does.
+        """
+        if self._version is None:
+            with self._lock:
+                if self._version is None:
+                    self._version = frame_version(self.df)
+        return self._version
+
+    def index(self, name):
+        """
+        Returns the named index, building it on first use.
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = self.index_builders[name](self.df)
+        return index
+
+    def fingerprint(self):
+        """
+        Returns a digest of the source files' paths, sizes and mtimes, or None without a source.
+        """
+        if self.source is None:
+            return None
+        paths = self.source()
+        if isinstance(paths, str):
+            paths = [paths]
+        digest = hashlib.sha1()
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode())
+        return digest.hexdigest()
+
+    def check_source(self):
+        """
+        Reloads the dataset if its source changed since it was loaded; returns whether it did.
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_seconds
+            if self._df is None or self.source is None:
+                return False
+            try:
+                current = self.fingerprint()
+            except OSError:
+                return False  # Source gone: keep serving what is loaded
+            if current == self._fingerprint:
+                return False
+            self.reload(refresh=True)
+            return True
+
+    def reload(self, refresh=False):
+        """
+        Drops the loaded frame and its indexes; refresh=True also discards the on-disk copy.
+        """
+        with self._lock:
+            if refresh and os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+            self._df = None
+            self._version = None
+            self._indexes = {}
+            self.generation += 1
+
+    def _load(self):
+        fingerprint = None
+        if self.check_seconds > 0:
+            try:
+                fingerprint = self.fingerprint()
+            except OSError:
+                pass  # Source unreadable: fall back to whatever copy exists
+        self._fingerprint = fingerprint
+        self._next_check = time.monotonic() + self.check_seconds
+        self.memory = None
+        if self.cache:
+            df = self._read_cache(fingerprint)
+            if df is not None:
+                df, changed = self._compact(df)
+                # A copy written before compaction existed: replace it so workers share the compact form
+                if changed and self._write_cache(df, fingerprint):
+                    return self._read_cache()
+                return df
+        df, _ = self._compact(self.validate(self.loader()))
+        if self.cache and self._write_cache(df, fingerprint):
+            return self._read_cache()
+        return df
+
+    def _compact(self, df):
+        """
+        Returns (frame, whether compaction changed it) and records the memory report.
+        """
+        if not self.compact:
+            return df, False
+        df, report = compact_frame(df)
+        # Nothing left to change in a compact Arrow copy: keep the report it was written with
+        if report['columns'] or self.memory is None:
+            self._set_memory(report)
+        return df, bool(report['columns'])
+
+    def _set_memory(self, report):
+        self.memory = report
+        metrics.set('dataset_memory_bytes', report['before'], dataset=self.name, stage='before')
+        metrics.set('dataset_memory_bytes', report['after'], dataset=self.name, stage='after')
+
+    def validate(self, df):
+        """
+        Checks that every schema column exists and casts it to its declared dtype.
+        """
+        missing = [col for col in self.schema if col not in df.columns]
+        if missing:
+            raise ValueError(f"Dataset {self.name!r} is missing columns: {', '.join(missing)}")
+        return df.astype(self.schema)
+
+    def _read_cache(self, fingerprint=None):
+        """
+        Memory-maps the Arrow copy; None when there is none or it was written
+        from other source files than ``fingerprint`` describes. Restores the
+        compaction report stored with it.
+        """
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return None
+        # The mapping stays open for as long as the returned columns reference it
+        reader = pa.ipc.open_file(pa.memory_map(self.cache_path))
+        if fingerprint is not None:
+            stored = (reader.schema.metadata or {}).get(SOURCE_KEY, b'').decode()
+            if stored != fingerprint:
+                return None
+        memory = (reader.schema.metadata or {}).get(MEMORY_KEY)
+        if memory is not None and self.compact:
+            self._set_memory(json.loads(memory))
+        table = reader.read_all()
+        # split_blocks keeps numeric columns as views over the mapped file
+        return table.to_pandas(split_blocks=True)
+
+    def _write_cache(self, df, fingerprint=None):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return False
+        os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        if fingerprint is not None:
+            metadata[SOURCE_KEY] = fingerprint.encode()
+        if self.memory is not None:
+            metadata[MEMORY_KEY] = json.dumps(self.memory).encode()
+        table = table.replace_schema_metadata(metadata)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, self.cache_path)
+        return True
+
+
+class DatasetRegistry:
+    """
+    Name -> Dataset lookup that drives the Input page's dataset dropdown and the Output page.
+    """
+
+    def __init__(self):
+        self._datasets = {}
+
+    def register(self, dataset):
+        self._datasets[dataset.name] = dataset
+        return dataset
+
+    def get(self, name):
+        return self._datasets.get(name)
+
+    def __getitem__(self, name):
+        return self._datasets[name]
+
+    def __iter__(self):
+        return iter(self._datasets.values())
+
+    def generation(self):
+        """
+        Changes whenever any registered dataset is reloaded; cheap, never loads data.
+        """
+        return sum(d.generation for d in self)
+
+    def options(self):
+        """
+        Options list for a dbc.Select / dcc.Dropdown.
+        """
+        return [{'label': d.label, 'value': d.name} for d in self]
+
+
+def finish_pandas_import():
+    """
+    Waits for a deferred pandas import running in another thread to finish.
+
+    Datasets and figures import pandas on first use, but Dash's JSON encoder
+    takes pandas from sys.modules without importing it, so a callback answered
+    meanwhile would see a half-initialized module. Run before every request;
+    re-importing blocks on the module lock until the import is done.
+    """
+    if 'pandas' in sys.modules:
+        import pandas  # noqa: F401
+
+
+# Registered datasets
+
+def px_data_path(name):
+    """
+    Returns the file behind plotly.express.data.<name>(), found without importing plotly.
+    """
+    package = importlib.util.find_spec('plotly').submodule_search_locations[0]
+    return os.path.join(package, 'package_data', 'datasets', f'{name}.csv.gz')
+
+
+def load_gapminder():
+    import plotly.express as px  # Deferred: px pulls in pandas and the plotly stack
+    return group_rows(px.data.gapminder())
+
+
+def load_iris():
+    import plotly.express as px
+    return px.data.iris()
+
+
+registry = DatasetRegistry()
+
+registry.register(Dataset(
+    'gapminder', 'GapMinder',
+    loader=load_gapminder,
+    source=partial(px_data_path, 'gapminder'),
+    schema={
+        'country': 'object', 'continent': 'object', 'year': 'int64', 'lifeExp': 'float64',
+        'pop': 'int64', 'gdpPercap': 'float64', 'iso_alpha': 'object', 'iso_num': 'int64',
+    },
+    indexes={
+        'country': CountryIndex,  # O(1) per-country row lookups for the Output page
+        'summary': CountrySummary,  # Per-country totals for the Output page's Country Data card
+        'query': QueryEngine,     # Indexed filters for the About page table and download
+    }
+))
+
+registry.register(Dataset(
+    'iris', 'Iris Dataset',
+    loader=load_iris,
+    source=partial(px_data_path, 'iris'),
+    schema={
+        'sepal_length': 'float64', 'sepal_width': 'float64', 'petal_length': 'float64',
+        'petal_width': 'float64', 'species': 'object', 'species_id': 'int64',
+    },
+    plot={
+        'x': 'sepal_length',
+        'y': 'petal_length',
+        'color': 'species',
+        'labels': {'sepal_length': 'Sepal Length', 'petal_length': 'Petal Length'},
+    }
+))
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from dash import Patch
+
+from pages.jobs import session_id
+
+# Patch-based delta updates (overridable through the environment)
+DELTA_UPDATES = os.environ.get('DELTA_UPDATES', '1') != '0'
+DELTA_MAX_ENTRIES = int(os.environ.get('DELTA_MAX_ENTRIES', 1000))  # (session, output) pairs remembered
+
+
+def _plain(value):
+    """
+    Returns value as it goes over the wire: JSON types only, components as dicts.
+    """
+    from plotly.io.json import to_json_plotly
+    return json.loads(to_json_plotly(value))
+
+
+def _is_container(value):
+    return isinstance(value, dict) or (isinstance(value, list) and any(isinstance(v, (dict, list)) for v in value))
+
+
+def tree_delta(old, new, patch):
+    """
+    Adds the operations turning old into new to patch. Dicts and lists of
+    containers (figure traces, component children) are diffed item by item;
+    anything else that changed, including numeric arrays, is replaced whole.
+    Both values must be dicts, or lists of the same length.
+    """
+    if isinstance(old, dict):
+        for key in old.keys() - new.keys():
+            del patch[key]
+        items = new.items()
+    else:
+        items = enumerate(new)
+    for key, value in items:
+        if isinstance(old, dict) and key not in old:
+            patch[key] = value
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if (isinstance(previous, dict) and isinstance(value, dict)) or (
+                isinstance(previous, list) and isinstance(value, list)
+                and len(previous) == len(value) and _is_container(value)):
+            tree_delta(previous, value, patch[key])
+        else:
+            patch[key] = value
+
+
+def records_delta(old, new, patch, key):
+    """
+    Adds row removals, inserts and in-place updates turning the record list old
+    into new to patch, matching rows by key(record).
+    """
+    matcher = SequenceMatcher(None, [key(r) for r in old], [key(r) for r in new], autojunk=False)
+    # Back to front, so earlier indexes are still valid when their turn comes
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == 'equal':
+            for offset in range(i2 - i1):
+                if old[i1 + offset] != new[j1 + offset]:
+                    patch[i1 + offset] = new[j1 + offset]
+            continue
+        for index in reversed(range(i1, i2)):
+            del patch[index]
+        for offset, record in enumerate(new[j1:j2]):
+            patch.insert(i1 + offset, record)
+
+
+def _patchable(old, new, diff):
+    if diff is not tree_delta:
+        return type(old) is type(new)
+    return (isinstance(old, dict) and isinstance(new, dict)) or (
+        isinstance(old, list) and isinstance(new, list) and len(old) == len(new))
+
+
+class DeltaTracker:
+    """
+    Remembers the last value each session was sent for an output so the next
+    update can go out as a Dash ``Patch`` of what changed.
+
+    Every response carries a fresh token, which the page keeps in a dcc.Store
+    and sends back with the next request. A patch is only sent when that token
+    matches the one remembered here, i.e. when the client provably holds the
+    remembered value. A reloaded page, a second tab, another worker, an
+    evicted entry or a request without a stored session all get the full
+    value instead, as does any update whose patch would not be smaller than
+    the full value.
+    """
+
+    def __init__(self, max_entries=DELTA_MAX_ENTRIES, enabled=DELTA_UPDATES):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._last = OrderedDict()  # (session id, output name) -> (token, plain value)
+        self._lock = threading.Lock()
+        self.patches = 0
+        self.full = 0
+
+    def update(self, name, token, value, diff=tree_delta):
+        """
+        Returns (value or Patch, new token) for the output `name`. diff(old, new, patch)
+        fills the patch from the previously sent and the new plain values.
+        """
+        sid = session_id()
+        if not self.enabled or sid is None:
+            return value, None
+        key = (sid, name)
+        plain = _plain(value)
+        new_token = uuid.uuid4().hex[:16]
+        with self._lock:
+            previous = self._last.pop(key, None)
+            self._last[key] = (new_token, plain)
+            while len(self._last) > self.max_entries:
+                self._last.popitem(last=False)
+        if previous is not None and token is not None and previous[0] == token \
+                and _patchable(previous[1], plain, diff):
+            patch = Patch()
+            diff(previous[1], plain, patch)
+            if len(json.dumps(patch.to_plotly_json())) < len(json.dumps(plain)):
+                self.patches += 1
+                return patch, new_token
+        self.full += 1
+        return value, new_token
+
+
+delta_tracker = DeltaTracker()
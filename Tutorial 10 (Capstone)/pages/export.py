@@ -0,0 +1,168 @@
+import os
+from urllib.parse import urlencode
+
+from dash import Input, Output, callback
+from flask import Response, abort, request, stream_with_context
+
+from pages.login import server
+from pages.datasets import registry
+from pages.coalesce import request_coalescer
+from pages.output import filter_rows
+
+# Streaming export settings
+EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', 50000))
+
+DOWNLOAD_PATH = '/download/filtered_gapminder'
+
+# Export format -> (file extension, mimetype)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrows', 'application/vnd.apache.arrow.stream'),
+    'feather': ('feather', 'application/vnd.apache.arrow.file'),
+}
+
+# String columns written as dictionary-encoded columns in the columnar formats
+DICTIONARY_COLUMNS = ('country', 'continent')
+
+
+def _float_arg(name):
+    value = request.args.get(name, '')
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def csv_chunks(frame, rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yields the selected rows as CSV text, chunk_rows at a time, header first.
+    """
+    if not len(rows):
+        yield frame.iloc[:0].to_csv()
+        return
+    for start in range(0, len(rows), chunk_rows):
+        yield frame.iloc[rows[start:start + chunk_rows]].to_csv(header=start == 0)
+
+
+class _StreamSink:
+    """
+    Write-only file object that hands whatever a pyarrow writer wrote so far back
+    to the response generator, so columnar files stream instead of buffering.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+        self._pos = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def arrow_chunks(frame, rows, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yields the selected rows as a Parquet, Arrow IPC stream or Feather (Arrow IPC file) body.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    # Fixed categories so every batch shares one dictionary; numeric columns convert zero-copy
+    dtypes = {
+        col: frame[col].dtype if isinstance(frame[col].dtype, pd.CategoricalDtype)
+        else pd.CategoricalDtype(pd.unique(frame[col]))
+        for col in DICTIONARY_COLUMNS if col in frame.columns
+    }
+
+    def table(start):
+        chunk = frame.iloc[rows[start:start + chunk_rows]].astype(dtypes)
+        return pa.Table.from_pandas(chunk, preserve_index=False)
+
+    first = table(0)
+    sink = _StreamSink()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, first.schema, compression='zstd')
+    else:
+        # Record batch bodies compressed like the Parquet pages; readers decompress transparently
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        new_writer = pa.ipc.new_stream if fmt == 'arrow' else pa.ipc.new_file
+        writer = new_writer(sink, first.schema, options=options)
+    writer.write_table(first)
+    yield sink.drain()
+    for start in range(chunk_rows, len(rows), chunk_rows):
+        writer.write_table(table(start))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+@server.route(DOWNLOAD_PATH + '.<fmt>')
+def download_filtered(fmt):
+    """
+    Streams the About page's filtered rows as csv, parquet, arrows or feather.
+    Takes the same filters as the page (pop_min, pop_max, lifeexp_min,
+    lifeexp_max and repeated country) as query parameters. CSV goes through the
+    response compression in pages/compression.py; the columnar formats are
+    zstd-compressed by their writers.
+    """
+    fmt = {ext: name for name, (ext, _) in EXPORT_FORMATS.items()}.get(fmt)
+    if fmt is None:
+        abort(404)
+    rows = filter_rows(
+        _float_arg('pop_min'),
+        _float_arg('pop_max'),
+        _float_arg('lifeexp_min'),
+        _float_arg('lifeexp_max'),
+        request.args.getlist('country')
+    )
+    ext, mimetype = EXPORT_FORMATS[fmt]
+    headers = {'Content-Disposition': f'attachment; filename="filtered_gapminder.{ext}"'}
+    if fmt == 'csv':
+        chunks = csv_chunks(registry['gapminder'].df, rows)  # Compressed by pages/compression.py
+    else:
+        chunks = arrow_chunks(registry['gapminder'].df, rows, fmt)
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@callback(
+    Output('download-btn', 'href'),
+    Input('pop-min-input', 'value'),
+    Input('pop-max-input', 'value'),
+    Input('lifeexp-min-input', 'value'),
+    Input('lifeexp-max-input', 'value'),
+    Input('country-dropdown', 'value'),
+    Input('download-format', 'value')
+)
+@request_coalescer.coalesced('update_download_link')
+def update_download_link(pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries, fmt='csv'):
+    """
+    Points the Download button at the streaming export for the current filters and format.
+    """
+    params = {
+        'pop_min': pop_min,
+        'pop_max': pop_max,
+        'lifeexp_min': lifeexp_min,
+        'lifeexp_max': lifeexp_max,
+    }
+    params = {k: v for k, v in params.items() if v is not None}
+    params['country'] = selected_countries or []
+    ext = EXPORT_FORMATS.get(fmt, EXPORT_FORMATS['csv'])[0]
+    return f"{DOWNLOAD_PATH}.{ext}?{urlencode(params, doseq=True)}"
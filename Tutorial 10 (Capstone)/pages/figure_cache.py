@@ -0,0 +1,42 @@
+import json
+import os
+
+from pages.versioned_cache import VersionedLRU
+
+# Memory budget for cached figure JSON
+FIGURE_CACHE_BYTES = int(os.environ.get('FIGURE_CACHE_BYTES', 64 * 1024 * 1024))
+
+
+def frame_version(df):
+    """
+    Returns a short content fingerprint of a DataFrame, used as its dataset version.
+    """
+    import pandas as pd
+    return format(int(pd.util.hash_pandas_object(df, index=False).sum()) & 0xFFFFFFFFFFFFFFFF, '016x')
+
+
+class FigureCache(VersionedLRU):
+    """
+    LRU cache of serialized Plotly figures, bounded by total JSON size.
+
+    Keys are whatever fully determines a figure, e.g. ('bar', country, metric)
+    or ('map', lat, lon). Entries are tagged with the dataset version; calling
+    set_version with a new version drops everything built from the old data.
+    """
+
+    def __init__(self, name, max_bytes=FIGURE_CACHE_BYTES):
+        super().__init__(name, max_bytes)
+
+    def get_or_build(self, key, build):
+        """
+        Returns the figure dict for key, calling build() to make a Plotly figure on a miss.
+        """
+        payload = self.get(key)
+        if payload is None:
+            from plotly.io.json import to_json_plotly
+            payload = to_json_plotly(build())
+            self.put(key, payload)
+        return json.loads(payload)
+
+
+figure_cache = FigureCache('figure')
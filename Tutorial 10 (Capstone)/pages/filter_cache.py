@@ -0,0 +1,59 @@
+import os
+
+from pages.versioned_cache import VersionedLRU
+
+# Memory budget for cached filter results (row id arrays)
+FILTER_CACHE_BYTES = int(os.environ.get('FILTER_CACHE_BYTES', 16 * 1024 * 1024))
+
+
+def filter_signature(engine, ranges=None, keys=None):
+    """
+    Returns a hashable key for a QueryEngine.query call that is equal for
+    filters selecting the same rows: range bounds beyond the data are clamped
+    to its minimum/maximum, and key values become a frozenset.
+    """
+    signature = []
+    for col, (lo, hi) in sorted((ranges or {}).items()):
+        if (lo, hi) == (None, None):
+            continue
+        values = engine.sorted[col]
+        if len(values):
+            if lo is not None and lo < values[0]:
+                lo = values[0].item()
+            if hi is not None and hi > values[-1]:
+                hi = values[-1].item()
+        signature.append(('range', col, lo, hi))
+    for col, accepted in sorted((keys or {}).items()):
+        if accepted:
+            signature.append(('key', col, frozenset(accepted)))
+    return tuple(signature)
+
+
+class FilterCache(VersionedLRU):
+    """
+    LRU cache of filter results as read-only row id arrays, bounded by their total size.
+
+    The About table and the downloads filter the same data with the same
+    inputs, so both go through here; anything differing only in how the
+    filters were written (see filter_signature) shares one entry. Entries are
+    tagged with the dataset version; calling set_version with a new version
+    drops everything computed from the old data.
+    """
+
+    def __init__(self, name, max_bytes=FILTER_CACHE_BYTES):
+        super().__init__(name, max_bytes, sizeof=lambda rows: rows.nbytes)
+
+    def query(self, engine, ranges=None, keys=None):
+        """
+        Returns engine.query(ranges, keys), from the cache when an equivalent filter was run before.
+        """
+        key = filter_signature(engine, ranges, keys)
+        rows = self.get(key)
+        if rows is None:
+            rows = engine.query(ranges=ranges, keys=keys)
+            rows.setflags(write=False)  # Shared between requests
+            self.put(key, rows)
+        return rows
+
+
+filter_cache = FilterCache('filter')
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from pages.geocoder import DATA_DIR, get_geocoder
+from pages.metrics import metrics
+
+# Reverse-geocode cache settings (overridable through the environment)
+GEOCODE_CACHE_PATH = os.environ.get('GEOCODE_CACHE_PATH', os.path.join(DATA_DIR, 'geocode_cache.sqlite3'))
+GEOCODE_PRECISION = int(os.environ.get('GEOCODE_PRECISION', 2))  # 2 decimals is roughly 1 km
+GEOCODE_MEMORY_SIZE = int(os.environ.get('GEOCODE_MEMORY_SIZE', 4096))
+GEOCODE_DISK_SIZE = int(os.environ.get('GEOCODE_DISK_SIZE', 100000))
+GEOCODE_TTL = float(os.environ.get('GEOCODE_TTL', 30 * 24 * 3600))
+# Expired and excess disk rows are deleted once every this many inserts
+GEOCODE_TRIM_EVERY = int(os.environ.get('GEOCODE_TRIM_EVERY', 256))
+
+# Backend behind the cache: 'offline' (bundled boundaries) or 'nominatim'.
+# NOMINATIM_DOMAIN / NOMINATIM_SCHEME let load tests point at a local stub.
+GEOCODER_BACKEND = os.environ.get('GEOCODER_BACKEND', 'offline')
+NOMINATIM_DOMAIN = os.environ.get('NOMINATIM_DOMAIN', 'nominatim.openstreetmap.org')
+NOMINATIM_SCHEME = os.environ.get('NOMINATIM_SCHEME', 'https')
+
+# Marker for "the backend found nothing here", which is worth caching too
+_NO_RESULT = object()
+
+
+class CachedGeocoder:
+    """
+    Reverse-geocode cache that sits in front of any backend with a geopy-style
+    ``reverse((lat, lon), language=...)`` method.
+
+    Coordinates are rounded to ``precision`` decimals before lookup, so nearby
+    submits share one entry. Entries live in an in-memory LRU and are written
+    through to SQLite so they survive restarts and are shared by every worker
+    on the host. Both tiers expire entries after ``ttl`` seconds and are bounded
+    in size; the disk tier is trimmed every ``trim_every`` inserts, so it can
+    hold up to that many rows over ``disk_size`` in between. Backend exceptions
+    are not cached and propagate to the caller.
+    """
+
+    def __init__(self, backend, path=GEOCODE_CACHE_PATH, precision=GEOCODE_PRECISION,
+                 memory_size=GEOCODE_MEMORY_SIZE, disk_size=GEOCODE_DISK_SIZE, ttl=GEOCODE_TTL,
+                 trim_every=GEOCODE_TRIM_EVERY, name='geocode'):
+        self.backend = backend
+        self.name = name
+        self.precision = precision
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self.trim_every = max(1, trim_every)
+        self._inserts = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS geocode ('
+                ' lat REAL, lon REAL, language TEXT, raw TEXT, created REAL,'
+                ' PRIMARY KEY (lat, lon, language))'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS geocode_created ON geocode (created)')
+            self._db.commit()
+
+    def key(self, lat, lon, language='en'):
+        """
+        Quantizes a coordinate into the cache key.
+        """
+        return (round(float(lat), self.precision), round(float(lon), self.precision), language)
+
+    def reverse(self, query, language='en', exactly_one=True, **kwargs):
+        """
+        Same contract as the backend's reverse(), answered from cache when possible.
+        """
+        key = self.key(query[0], query[1], language)
+        raw = self._get(key)
+        if raw is None:
+            with self._lock:
+                self.misses += 1
+            metrics.inc('cache_requests_total', cache=self.name, result='miss')
+            location = self.backend.reverse(key[:2], language=language, exactly_one=True, **kwargs)
+            raw = location.raw if location else _NO_RESULT
+            self._put(key, raw)
+        if raw is _NO_RESULT:
+            return None
+        from geopy.location import Location
+        address = raw.get('address', {})
+        location = Location(address.get('country', ''), key[:2], raw)
+        return location if exactly_one else [location]
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                raw, created = entry
+                if now - created < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    metrics.inc('cache_requests_total', cache=self.name, result='hit')
+                    return raw
+                del self._memory[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                'SELECT raw, created FROM geocode WHERE lat = ? AND lon = ? AND language = ?', key
+            ).fetchone()
+        if row is None or now - row[1] >= self.ttl:
+            return None
+        raw = _NO_RESULT if row[0] is None else json.loads(row[0])
+        self._remember(key, raw, row[1])
+        with self._lock:
+            self.disk_hits += 1
+        metrics.inc('cache_requests_total', cache=self.name, result='disk_hit')
+        return raw
+
+    def _put(self, key, raw):
+        created = time.time()
+        self._remember(key, raw, created)
+        if self._db is None:
+            return
+        payload = None if raw is _NO_RESULT else json.dumps(raw)
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO geocode (lat, lon, language, raw, created) VALUES (?, ?, ?, ?, ?)',
+                key + (payload, created)
+            )
+            self._inserts += 1
+            if self._inserts >= self.trim_every:
+                self._inserts = 0
+                self._trim(created)
+            self._db.commit()
+
+    def _trim(self, now):
+        # Called with _lock held. TTL first, then the oldest rows past the size bound; both use the created index
+        cur = self._db.execute('DELETE FROM geocode WHERE created < ?', (now - self.ttl,))
+        evicted = cur.rowcount
+        rows = self._db.execute('SELECT COUNT(*) FROM geocode').fetchone()[0]
+        if rows > self.disk_size:
+            cur = self._db.execute(
+                'DELETE FROM geocode WHERE rowid IN (SELECT rowid FROM geocode ORDER BY created LIMIT ?)',
+                (rows - self.disk_size,)
+            )
+            evicted += cur.rowcount
+            rows -= cur.rowcount
+        self.evictions += evicted
+        metrics.inc('cache_evictions_total', evicted, cache=self.name + '_disk')
+        metrics.set('cache_entries', rows, cache=self.name + '_disk')
+
+    def _remember(self, key, raw, created):
+        with self._lock:
+            self._memory[key] = (raw, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+                metrics.inc('cache_evictions_total', cache=self.name)
+            metrics.set('cache_entries', len(self._memory), cache=self.name)
+
+    def stats(self):
+        """
+        Returns hit/miss counters and current cache sizes.
+        """
+        with self._lock:
+            disk_entries = self._db.execute('SELECT COUNT(*) FROM geocode').fetchone()[0] if self._db else 0
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def clear(self):
+        """
+        Drops every cached entry from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM geocode')
+                self._db.commit()
+
+
+def make_backend(name=GEOCODER_BACKEND):
+    """
+    Builds the configured geocoder backend.
+    """
+    if name == 'nominatim':
+        from geopy.geocoders import Nominatim
+        return Nominatim(user_agent="dash_app", domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+    if name == 'offline':
+        return get_geocoder()
+    raise ValueError(f"Unknown GEOCODER_BACKEND {name!r}; expected 'offline' or 'nominatim'.")
+
+
+@lru_cache(maxsize=1)
+def get_cached_geocoder():
+    """
+    Returns the process-wide cache wrapped around the configured backend.
+    """
+    return CachedGeocoder(make_backend())
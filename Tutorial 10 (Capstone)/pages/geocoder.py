@@ -0,0 +1,268 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Offline reverse geocoding
+#
+# Country boundaries come from the Natural Earth 1:110m admin-0 dataset
+# (public domain), bundled as data/countries_110m.geojson. Places that scale
+# gets wrong are patched up in two ways: SMALL_AREAS covers states too small
+# to have a polygon of their own (Bahrain, Singapore, Mauritius, ...) and
+# capitals that the simplified borders put in a neighbour, and a point that
+# falls just off a simplified coastline goes to the nearest country within
+# NEAREST_KM.
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+BOUNDARIES_PATH = os.path.join(DATA_DIR, 'countries_110m.geojson')
+
+# Size of a spatial-index grid cell in degrees
+GRID_DEG = 5.0
+# A point outside every polygon resolves to the nearest one within this distance
+NEAREST_KM = 30.0
+KM_PER_DEG = 111.2
+
+# Natural Earth names as gapminder_df['country'] spells them; abbreviated
+# names of countries gapminder lacks are written out in full
+GAPMINDER_NAMES = {
+    'Bosnia and Herz.': 'Bosnia and Herzegovina',
+    'Central African Rep.': 'Central African Republic',
+    'Congo': 'Congo, Rep.',
+    "Côte d'Ivoire": "Cote d'Ivoire",
+    'Czechia': 'Czech Republic',
+    'Dem. Rep. Congo': 'Congo, Dem. Rep.',
+    'Dominican Rep.': 'Dominican Republic',
+    'Eq. Guinea': 'Equatorial Guinea',
+    'eSwatini': 'Swaziland',
+    'Falkland Is.': 'Falkland Islands',
+    'Fr. S. Antarctic Lands': 'French Southern and Antarctic Lands',
+    'Hong Kong': 'Hong Kong, China',
+    'N. Cyprus': 'Northern Cyprus',
+    'North Korea': 'Korea, Dem. Rep.',
+    'Palestine': 'West Bank and Gaza',
+    'S. Sudan': 'South Sudan',
+    'São Tomé and Principe': 'Sao Tome and Principe',
+    'Slovakia': 'Slovak Republic',
+    'Solomon Is.': 'Solomon Islands',
+    'South Korea': 'Korea, Rep.',
+    'United States of America': 'United States',
+    'W. Sahara': 'Western Sahara',
+    'Yemen': 'Yemen, Rep.',
+}
+
+# Areas the 1:110m polygons miss or give to a neighbour, with their ISO alpha-2
+# code and the (lat, lon, radius in km) circles that cover them. They are
+# checked before the polygons.
+SMALL_AREAS = [
+    ('Bahrain', 'BH', [(26.03, 50.55, 30)]),
+    ('Comoros', 'KM', [(-11.65, 43.33, 45), (-12.25, 44.42, 25), (-12.33, 43.75, 20)]),
+    ('Congo', 'CG', [(-4.24, 15.26, 5)]),  # Brazzaville, across the river from Kinshasa
+    ('Eq. Guinea', 'GQ', [(3.55, 8.70, 35)]),  # Bioko, with the capital Malabo
+    ('Hong Kong', 'HK', [(22.30, 114.17, 10), (22.40, 114.23, 9), (22.42, 114.03, 8),
+                          (22.48, 114.13, 5), (22.26, 113.94, 10)]),
+    ('Israel', 'IL', [(31.78, 35.19, 4)]),  # West Jerusalem
+    ('Mauritius', 'MU', [(-20.25, 57.55, 40), (-19.72, 63.42, 20)]),
+    ('Reunion', 'RE', [(-21.13, 55.53, 40)]),
+    ('São Tomé and Principe', 'ST', [(0.23, 6.60, 35), (1.61, 7.40, 20)]),
+    ('Singapore', 'SG', [(1.34, 103.72, 11), (1.35, 103.89, 13), (1.42, 103.80, 6)]),
+]
+
+
+class _Ring:
+    """
+    One closed polygon ring stored as edge arrays for a vectorised crossing test.
+    """
+
+    def __init__(self, coords):
+        pts = np.asarray(coords, dtype=np.float64)
+        if len(pts) and not np.array_equal(pts[0], pts[-1]):
+            pts = np.vstack([pts, pts[:1]])
+        self.x1 = pts[:-1, 0]
+        self.y1 = pts[:-1, 1]
+        x2 = pts[1:, 0]
+        y2 = pts[1:, 1]
+        dy = y2 - self.y1
+        # Horizontal edges never cross the test ray; give them a harmless slope
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.inv_slope = np.where(dy != 0, (x2 - self.x1) / dy, 0.0)
+        self.x2 = x2
+        self.y2 = y2
+        self.bbox = (pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max())
+
+    def contains(self, x, y):
+        straddles = (self.y1 > y) != (self.y2 > y)
+        x_cross = self.x1 + (y - self.y1) * self.inv_slope
+        return bool(np.count_nonzero(straddles & (x < x_cross)) & 1)
+
+
+class _Area:
+    """
+    A country given as circles around points, for places too small for the polygons.
+    """
+
+    def __init__(self, country, iso_a2, circles):
+        self.country = country
+        self.iso_a2 = iso_a2
+        self.circles = circles
+
+    def contains(self, x, y):
+        for lat, lon, radius_km in self.circles:
+            dx = ((x - lon + 180.0) % 360.0 - 180.0) * np.cos(np.radians(lat))
+            if np.hypot(dx, y - lat) * KM_PER_DEG <= radius_km:
+                return True
+        return False
+
+
+class _Polygon:
+    """
+    An outer ring plus its holes, belonging to one country.
+    """
+
+    def __init__(self, country, iso_a2, iso_a3, rings):
+        self.country = country
+        self.iso_a2 = iso_a2
+        self.iso_a3 = iso_a3
+        self.outer = _Ring(rings[0])
+        self.holes = [_Ring(r) for r in rings[1:]]
+        self.bbox = self.outer.bbox
+
+    def contains(self, x, y):
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        if not self.outer.contains(x, y):
+            return False
+        return not any(h.contains(x, y) for h in self.holes)
+
+    def distance_km(self, x, y):
+        """
+        Approximate distance from a point to the outer ring, in km.
+        """
+        ring = self.outer
+        scale = np.cos(np.radians(y))
+        ax = (ring.x1 - x) * scale
+        ay = ring.y1 - y
+        dx = (ring.x2 - ring.x1) * scale
+        dy = ring.y2 - ring.y1
+        length2 = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.where(length2 > 0, -(ax * dx + ay * dy) / length2, 0.0), 0.0, 1.0)
+        return float(np.min(np.hypot(ax + t * dx, ay + t * dy))) * KM_PER_DEG
+
+
+class OfflineGeocoder:
+    """
+    Reverse geocoder that resolves (lat, lon) to a country without any network access.
+
+    Polygons are bucketed into a regular lat/lon grid so a lookup only runs the
+    point-in-polygon test against the handful of countries whose bounding box
+    overlaps the query cell. SMALL_AREAS are tried first, and a point outside
+    every polygon falls back to the nearest one within ``nearest_km``, so
+    coastal cities cut off by the simplified outlines still resolve.
+    ``reverse`` mirrors geopy's Nominatim signature and returns a ``Location``
+    whose ``raw['address']['country']`` is already spelled the way
+    gapminder_df spells it.
+    """
+
+    def __init__(self, path=BOUNDARIES_PATH, grid_deg=GRID_DEG, name_map=None, nearest_km=NEAREST_KM):
+        self.grid_deg = grid_deg
+        self.name_map = GAPMINDER_NAMES if name_map is None else name_map
+        self.nearest_km = nearest_km
+        self.areas = [_Area(self.name_map.get(name, name), iso_a2, circles) for name, iso_a2, circles in SMALL_AREAS]
+        self.polygons = []
+        self.grid = {}
+        with open(path, encoding='utf-8') as f:
+            features = json.load(f)['features']
+        for feature in features:
+            self._add_feature(feature)
+
+    def _add_feature(self, feature):
+        props = feature['properties']
+        name = self.name_map.get(props['name'], props['name'])
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            parts = [geometry['coordinates']]
+        else:
+            parts = geometry['coordinates']
+        for rings in parts:
+            polygon = _Polygon(name, props.get('iso_a2'), props.get('iso_a3'), rings)
+            idx = len(self.polygons)
+            self.polygons.append(polygon)
+            min_x, min_y, max_x, max_y = polygon.bbox
+            for cx in range(self._cell(min_x), self._cell(max_x) + 1):
+                for cy in range(self._cell(min_y), self._cell(max_y) + 1):
+                    self.grid.setdefault((cx, cy), []).append(idx)
+
+    def _cell(self, value):
+        return int(np.floor(value / self.grid_deg))
+
+    def lookup(self, lat, lon):
+        """
+        Returns the matching _Area or _Polygon for a coordinate, or None over open water.
+        """
+        lat = float(lat)
+        lon = float(lon)
+        if not -90.0 <= lat <= 90.0:
+            raise ValueError("Latitude must be in the [-90; 90] range.")
+        # Wrap longitude into [-180, 180)
+        lon = (lon + 180.0) % 360.0 - 180.0
+        for area in self.areas:
+            if area.contains(lon, lat):
+                return area
+        for idx in self.grid.get((self._cell(lon), self._cell(lat)), ()):
+            polygon = self.polygons[idx]
+            if polygon.contains(lon, lat):
+                return polygon
+        return self._nearest(lat, lon)
+
+    def _nearest(self, lat, lon):
+        if self.nearest_km <= 0:
+            return None
+        margin_y = self.nearest_km / KM_PER_DEG
+        margin_x = margin_y / max(np.cos(np.radians(lat)), 0.1)
+        candidates = set()
+        for cx in range(self._cell(lon - margin_x), self._cell(lon + margin_x) + 1):
+            for cy in range(self._cell(lat - margin_y), self._cell(lat + margin_y) + 1):
+                candidates.update(self.grid.get((cx, cy), ()))
+        best, best_km = None, self.nearest_km
+        for idx in sorted(candidates):
+            polygon = self.polygons[idx]
+            min_x, min_y, max_x, max_y = polygon.bbox
+            if lon < min_x - margin_x or lon > max_x + margin_x or lat < min_y - margin_y or lat > max_y + margin_y:
+                continue
+            km = polygon.distance_km(lon, lat)
+            if km <= best_km:
+                best, best_km = polygon, km
+        return best
+
+    def country(self, lat, lon):
+        """
+        Returns the gapminder-style country name for a coordinate, or None.
+        """
+        polygon = self.lookup(lat, lon)
+        return polygon.country if polygon else None
+
+    def reverse(self, query, language='en', exactly_one=True, **kwargs):
+        """
+        Drop-in replacement for Nominatim.reverse((lat, lon), language='en').
+        Extra keyword arguments are accepted and ignored.
+        """
+        from geopy.location import Location  # importing geopy loads every geocoder module
+
+        lat, lon = query
+        polygon = self.lookup(lat, lon)
+        if polygon is None:
+            return None
+        # Nominatim reports the lower-case ISO 3166-1 alpha-2 code
+        raw = {'address': {'country': polygon.country, 'country_code': (polygon.iso_a2 or '').lower()}}
+        location = Location(polygon.country, (float(lat), float(lon)), raw)
+        return location if exactly_one else [location]
+
+
+@lru_cache(maxsize=1)
+def get_geocoder():
+    """
+    Returns the process-wide OfflineGeocoder, loading the boundaries on first use.
+    """
+    return OfflineGeocoder()
@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import has_request_context, session
+
+from pages.geocoder import DATA_DIR
+
+# Background job settings
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 300))  # Seconds an uncollected result is kept
+JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', os.path.join(DATA_DIR, 'jobs.sqlite3'))
+
+PENDING = 'pending'
+DONE = 'done'
+CANCELLED = 'cancelled'
+UNKNOWN = 'unknown'
+# Stored states only: a collected job polls as CANCELLED, a failed one raises
+COLLECTED = 'collected'
+FAILED = 'failed'
+
+
+class JobQueue:
+    """
+    Job queue backed by a thread pool, with job states and results kept in a
+    SQLite table shared by every worker on the host.
+
+    Every job belongs to a session. Submitting a new job for a session cancels
+    the previous one, whichever worker runs it, so only the most recent submit
+    is ever delivered; jobs submitted without a session (None) never supersede
+    each other. A job runs in the worker it was submitted to, but any worker
+    can answer polls for it. Results are held until they are collected or
+    JOB_RESULT_TTL expires, and superseded and collected jobs are remembered
+    for as long, so a late poll for them reports CANCELLED; UNKNOWN means the
+    job has expired (or never existed). The connection is opened on first use
+    in each process, so a queue created before a pre-fork server forks is safe
+    to inherit.
+    """
+
+    def __init__(self, path=JOB_STORE_PATH, workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL):
+        self.path = path
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._executor = None
+        self._futures = {}  # job_id -> future, for jobs submitted in this process
+        self._db = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS job ('
+                ' id TEXT PRIMARY KEY, session TEXT, state TEXT, result TEXT, updated REAL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS job_session ON job (session, state)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS job_updated ON job (updated)')
+            self._db.commit()
+            # Pool threads do not survive a fork
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            self._futures = {}
+            self._pid = os.getpid()
+        return self._db
+
+    def submit(self, session_id, fn, *args, **kwargs):
+        """
+        Queues fn(*args, **kwargs) and returns its job id. The result must be JSON-serializable.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            self._expire(db, now)
+            if session_id is not None:
+                superseded = [row[0] for row in db.execute(
+                    'SELECT id FROM job WHERE session = ? AND state = ?', (session_id, PENDING))]
+                db.execute('UPDATE job SET state = ?, updated = ? WHERE session = ? AND state = ?',
+                           (CANCELLED, now, session_id, PENDING))
+                for previous in superseded:
+                    # Not started yet: never runs. Already running, or in another worker: result is discarded.
+                    future = self._futures.pop(previous, None)
+                    if future is not None:
+                        future.cancel()
+            db.execute('INSERT INTO job (id, session, state, result, updated) VALUES (?, ?, ?, NULL, ?)',
+                       (job_id, session_id, PENDING, now))
+            db.commit()
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            row = self._connection().execute('SELECT state FROM job WHERE id = ?', (job_id,)).fetchone()
+        if row is None or row[0] != PENDING:
+            self._forget(job_id)
+            return  # Superseded from another worker before it started
+        try:
+            state, result = DONE, json.dumps(fn(*args, **kwargs))
+        except Exception as e:
+            state, result = FAILED, f'{type(e).__name__}: {e}'
+        finally:
+            self._forget(job_id)
+        with self._lock:
+            db = self._connection()
+            # Only a job nobody superseded meanwhile gets its result stored
+            db.execute('UPDATE job SET state = ?, result = ?, updated = ? WHERE id = ? AND state = ?',
+                       (state, result, time.time(), job_id, PENDING))
+            db.commit()
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def poll(self, job_id):
+        """
+        Returns (state, result). A finished job's result is handed out once; a
+        job that raised raises RuntimeError instead.
+        """
+        with self._lock:
+            db = self._connection()
+            row = db.execute('SELECT state, result FROM job WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return UNKNOWN, None
+            state, result = row
+            if state == PENDING:
+                return PENDING, None
+            if state not in (DONE, FAILED):
+                return CANCELLED, None
+            # Another worker may be answering a poll for the same job right now
+            collected = db.execute('UPDATE job SET state = ?, result = NULL, updated = ? WHERE id = ? AND state = ?',
+                                   (COLLECTED, time.time(), job_id, state)).rowcount
+            db.commit()
+        if not collected:
+            return CANCELLED, None
+        if state == FAILED:
+            raise RuntimeError(f'Job {job_id} failed: {result}')
+        return DONE, json.loads(result)
+
+    def _expire(self, db, now):
+        # Pending jobs past the TTL were lost with a worker (or never finished): they go too
+        db.execute('DELETE FROM job WHERE updated < ?', (now - self.result_ttl,))
+
+
+def session_id():
+    """
+    Returns the server-side session id of the current request, or None when it
+    has no stored session (e.g. a cookieless request to the login-exempt
+    /_dash-* routes). Never modifies the session, so it creates no store rows.
+    """
+    if not has_request_context():
+        return 'local'
+    return getattr(session, 'sid', None)
+
+
+job_queue = JobQueue()
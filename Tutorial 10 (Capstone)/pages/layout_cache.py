@@ -0,0 +1,75 @@
+import threading
+
+from flask import Response, request
+
+
+class LayoutCache:
+    """
+    Pre-serialized responses for the display_page routing callback.
+
+    Page skeletons are static (their data-dependent parts are filled in by
+    their own callbacks), so the JSON Dash would produce for each pathname is
+    built once per dataset generation and kept as bytes. ``install`` adds a
+    before_request hook that answers the routing callback straight from those
+    bytes, skipping the component tree walk and JSON encode; every other
+    callback goes through Dash as usual.
+    """
+
+    def __init__(self, output_id, output_property, generation):
+        self.output_id = output_id
+        self.output_property = output_property
+        self.generation = generation  # callable returning the current dataset generation
+        self.pages = {}
+        self.default = None
+        self._bytes = {}
+        self._lock = threading.Lock()
+
+    def register(self, pathname, builder, default=False):
+        """
+        Registers the layout builder for a pathname; default=True makes it the fallback page.
+        """
+        self.pages[pathname] = builder
+        if default:
+            self.default = builder
+
+    def layout(self, pathname):
+        """
+        Returns the component tree for a pathname (the uncached path).
+        """
+        return self.pages.get(pathname, self.default)()
+
+    def payload(self, pathname):
+        """
+        Returns the serialized callback response for a pathname.
+        """
+        builder = self.pages.get(pathname, self.default)
+        key = (builder, self.generation())
+        data = self._bytes.get(key)
+        if data is None:
+            from plotly.io.json import to_json_plotly
+            response = {'multi': True, 'response': {self.output_id: {self.output_property: builder()}}}
+            data = to_json_plotly(response).encode('utf-8')
+            with self._lock:
+                # Drop skeletons serialized for older generations
+                self._bytes = {k: v for k, v in self._bytes.items() if k[1] == key[1]}
+                self._bytes[key] = data
+        return data
+
+    def install(self, app):
+        """
+        Serves the routing callback from cache on app's Flask server.
+        """
+        update_path = app.config.routes_pathname_prefix + '_dash-update-component'
+        output = f'{self.output_id}.{self.output_property}'
+
+        @app.server.before_request
+        def serve_cached_layout():
+            if request.method != 'POST' or request.path != update_path:
+                return None
+            body = request.get_json(silent=True)  # cached, Dash re-reads it for free
+            if not body or body.get('output') != output:
+                return None
+            pathname = (body.get('inputs') or [{}])[0].get('value')
+            return Response(self.payload(pathname), mimetype='application/json')
+
+        return serve_cached_layout
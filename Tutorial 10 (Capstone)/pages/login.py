@@ -1,24 +1,29 @@
+import os
+
 import dash
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html
 import dash_bootstrap_components as dbc
-import dash_daq as daq
-import pandas as pd
-import plotly.express as px
 from flask import redirect, url_for, request, session, flash
-from geopy.geocoders import Nominatim  # For reverse geocoding
-import dash.dash_table as dt
-
-# For CSV download (dcc.Download)
-from dash import dcc  # ensures we have dcc.Download
 
-# Load datasets
-gapminder_df = px.data.gapminder()
-iris_df = px.data.iris()
+from pages.datasets import finish_pandas_import
+from pages.compression import response_compressor
+from pages.metrics import METRICS_PATH, metrics
+from pages.sessions import make_session_interface, rotate_session
 
 # Initialize the Dash app with Bootstrap
 app = dash.Dash(__name__, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
-server.secret_key = 'your_secret_key_here'  # Needed for session management
+# Same value on every worker; wsgi.py refuses to start without it, the placeholder is for app.py only
+server.secret_key = os.environ.get('SECRET_KEY', 'your_secret_key_here')
+# Sessions live server-side (pages/sessions.py); the cookie holds an opaque id
+server.session_interface = make_session_interface()
+
+# Per-callback latency histograms, scraped from METRICS_PATH
+metrics.install(app)
+# Brotli/gzip for Dash's JSON, the component bundles and the downloads
+response_compressor.install(app, paths=('/download/',))
+# pandas is imported lazily; let a pending import finish before Dash encodes anything
+server.before_request(finish_pandas_import)
 
 
 # Flask routes for login/logout
@@ -27,11 +32,11 @@ server.secret_key = 'your_secret_key_here'  # Needed for session management
 def require_login():
     """
     This function runs before every request.
-    It checks if the user is logged in, except for the /login and /logout endpoints,
-    static assets, or Dash assets (/_dash-*).
+    It checks if the user is logged in, except for the /login, /logout and /metrics
+    endpoints, static assets, or Dash assets (/_dash-*).
     If not logged in, it redirects to /login.
     """
-    if request.path in ['/login', '/logout'] or request.path.startswith('/static') or request.path.startswith('/_dash-'):
+    if request.path in ['/login', '/logout', METRICS_PATH] or request.path.startswith('/static') or request.path.startswith('/_dash-'):
         return None
     if not session.get('logged_in'):
         return redirect(url_for('login'))
@@ -46,6 +51,7 @@ def login():
         password = request.form.get('password')
         # For demonstration, using hardcoded credentials:
         if username == 'admin' and password == 'password':
+            rotate_session(session)
             session['logged_in'] = True
             return redirect('/')
         else:
@@ -107,8 +113,11 @@ navbar = dbc.NavbarSimple(
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
     dcc.Store(id='store-data'),
+    dcc.Store(id='geocode-job'),  # Pending background geocode for this browser
+    dcc.Interval(id='geocode-poll', interval=250, disabled=True),
     navbar,  # Multipage navigation bar at the top
-    html.Div(id='page-content', style={"marginTop": "75px"})  # Add top margin to avoid navbar overlap
+    html.Div(id='geocode-status', className="container", style={"marginTop": "75px"}),  # Add top margin to avoid navbar overlap
+    html.Div(id='page-content')
 ])
 
 
@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import Response, g, request
+
+METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')
+# Label for update requests that name no registered callback
+UNKNOWN_CALLBACK = 'unknown'
+
+# Histogram bucket upper bounds (Prometheus "le"); +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CallbackMetrics:
+    """
+    Per-callback latency, payload size and error counts, served as Prometheus text.
+
+    ``install`` times every request to _dash-update-component (labelled with
+    the callback's function name, looked up from its callback ID) and to the
+    app's own Flask routes, such as the downloads. Timing happens at the HTTP
+    layer so callbacks answered before Dash sees them (layout_cache) and
+    streamed responses (timed until the last chunk is sent) are covered too.
+    Work outside a request, like the geocode jobs, is recorded with ``timed``.
+
+    Each worker process keeps its own numbers; scrape every worker.
+    """
+
+    def __init__(self):
+        self.duration = {}
+        self.bytes_in = {}
+        self.bytes_out = {}
+        self.errors = {}
+        self.families = {}  # name -> (type, help text) for inc()
+        self.values = {}    # (name, sorted label items) -> value
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        """
+        Declares a counter or gauge family for inc(); other modules add their own this way.
+        """
+        self.families[name] = (kind, help_text)
+
+    def inc(self, name, value=1, **labels):
+        """
+        Adds value to a described family's series for labels.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """
+        Sets a described gauge family's series for labels to value.
+        """
+        with self._lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, seconds, bytes_in=None, bytes_out=None, error=False):
+        """
+        Records one call of `name`.
+        """
+        with self._lock:
+            if name not in self.duration:
+                self.duration[name] = Histogram(LATENCY_BUCKETS)
+                self.bytes_in[name] = Histogram(SIZE_BUCKETS)
+                self.bytes_out[name] = Histogram(SIZE_BUCKETS)
+                self.errors[name] = 0
+            self.duration[name].observe(seconds)
+            if bytes_in is not None:
+                self.bytes_in[name].observe(bytes_in)
+            if bytes_out is not None:
+                self.bytes_out[name].observe(bytes_out)
+            if error:
+                self.errors[name] += 1
+
+    def timed(self, name):
+        """
+        Decorator recording a plain function's wall time and exceptions under `name`.
+        """
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                error = True
+                try:
+                    result = fn(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    self.observe(name, time.perf_counter() - start, error=error)
+            return wrapper
+        return decorate
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        import psutil
+        lines = []
+        with self._lock:
+            series = (
+                ('dash_callback_duration_seconds', 'Wall time per callback.', self.duration),
+                ('dash_callback_request_bytes', 'Request payload size per callback.', self.bytes_in),
+                ('dash_callback_response_bytes', 'Response payload size per callback.', self.bytes_out),
+            )
+            for name, help_text, histograms in series:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for callback_name, histogram in sorted(histograms.items()):
+                    lines += histogram.lines(name, f'callback="{_label(callback_name)}"')
+            lines += ['# HELP dash_callback_errors_total Failed calls per callback.',
+                      '# TYPE dash_callback_errors_total counter']
+            lines += [f'dash_callback_errors_total{{callback="{_label(name)}"}} {count}'
+                      for name, count in sorted(self.errors.items())]
+            for name, (kind, help_text) in sorted(self.families.items()):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for (series, labels), value in sorted(self.values.items()):
+                    if series == name:
+                        label_text = ','.join(f'{k}="{_label(v)}"' for k, v in labels)
+                        lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        process = psutil.Process()
+        lines += [
+            '# HELP process_resident_memory_bytes Resident set size.',
+            '# TYPE process_resident_memory_bytes gauge',
+            f'process_resident_memory_bytes {process.memory_info().rss}',
+            '# HELP process_threads Threads in this worker process.',
+            '# TYPE process_threads gauge',
+            f'process_threads {process.num_threads()}',
+            '# HELP process_cpu_seconds_total User and system CPU time.',
+            '# TYPE process_cpu_seconds_total counter',
+            f'process_cpu_seconds_total {sum(process.cpu_times()[:2])}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def install(self, app):
+        """
+        Adds the timing hooks and the METRICS_PATH route to app's Flask server.
+        Call before other before_request hooks that may answer a request themselves.
+        """
+        server = app.server
+        update_path = app.config.routes_pathname_prefix + '_dash-update-component'
+        names = {}  # callback ID -> function name
+
+        def request_name():
+            if request.path == update_path:
+                output = (request.get_json(silent=True) or {}).get('output', '')
+                name = names.get(output)
+                if name is None:
+                    entry = app.callback_map.get(output)
+                    function = entry.get('callback') if entry is not None else None
+                    if function is None:
+                        # Client-supplied and reachable without login: unregistered and
+                        # clientside outputs (which never post here) get no label of their own
+                        return UNKNOWN_CALLBACK
+                    name = names[output] = function.__name__
+                return name
+            view = server.view_functions.get(request.endpoint)
+            if view is not None and view.__module__.startswith('pages.') and request.endpoint != 'metrics':
+                return request.endpoint
+            return None
+
+        @server.before_request
+        def start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @server.after_request
+        def record(response):
+            start = g.pop('metrics_start', None)
+            name = request_name() if start is not None else None
+            if name is None:
+                return response
+            bytes_in = request.content_length or 0
+            error = response.status_code >= 500
+            if not response.is_streamed:
+                self.observe(name, time.perf_counter() - start, bytes_in, response.calculate_content_length(), error)
+                return response
+            chunks = response.response
+            sent = [0]
+
+            def counting():
+                try:
+                    for chunk in chunks:
+                        sent[0] += len(chunk)
+                        yield chunk
+                finally:
+                    if hasattr(chunks, 'close'):
+                        chunks.close()
+
+            response.response = counting()
+            response.call_on_close(lambda: self.observe(name, time.perf_counter() - start, bytes_in, sent[0], error))
+            return response
+
+        @server.route(METRICS_PATH, endpoint='metrics')
+        def serve_metrics():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+        return record
+
+
+metrics = CallbackMetrics()
+# Shared by the in-process caches (figure, filter, geocode); label cache= tells them apart
+metrics.describe('cache_requests_total', 'counter', 'Cache lookups, by cache and result (hit, disk_hit, miss).')
+metrics.describe('cache_evictions_total', 'counter', 'Cache entries dropped for space or age, by cache.')
+metrics.describe('cache_entries', 'gauge', 'Entries currently held, by cache.')
+metrics.describe('cache_bytes', 'gauge', 'Bytes currently held, by size-bounded cache.')
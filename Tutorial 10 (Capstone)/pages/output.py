@@ -1,198 +1,163 @@
+import os
+from functools import lru_cache
+
 import dash
-from dash import dcc, html, Input, Output, State, callback
-import dash_bootstrap_components as dbc
-import dash_daq as daq
-import pandas as pd
-import plotly.express as px
-from flask import redirect, url_for, request, session, flash
-from geopy.geocoders import Nominatim  # For reverse geocoding
-import dash.dash_table as dt
-from pages.login import dbc, gapminder_df
+from dash import dcc, html, Input, Output, State, callback, clientside_callback
+from pages.login import app, dbc
+from pages.datasets import registry
 from pages.about import about_layout
 from pages.Input_page import input_layout
+from pages.geocache import get_cached_geocoder
+from pages.jobs import CANCELLED, PENDING, UNKNOWN, job_queue, session_id
+from pages.figure_cache import figure_cache
+from pages.filter_cache import filter_cache
+from pages.table_query import apply_filter_query, apply_sort, page_records
+from pages.layout_cache import LayoutCache
+from pages.metrics import metrics
+from pages.delta import delta_tracker, records_delta
+from pages.coalesce import request_coalescer
+from pages.tiles import TILE_URL
 
 
 # Output Layout
 
-output_layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("User Provided Fields"),
-                dbc.CardBody([
-                    html.Div([
-                        html.Strong("Latitude: "),
-                        html.Span(id='display-lat')
-                    ], className="mb-2"),
-                    html.Div([
-                        html.Strong("Longitude: "),
-                        html.Span(id='display-lon')
-                    ], className="mb-2"),
-                    html.Div([
-                        html.Strong("Dataset: "),
-                        html.Span(id='display-dataset')
-                    ], className="mb-2"),
-                    html.Div([
-                        html.Strong("Country: "),
-                        html.Span(id='display-country')
-                    ], className="mb-2"),
+@lru_cache(maxsize=1)
+def output_layout():
+    """
+    Builds the Output page on first use.
+    """
+    return dbc.Container([
+        dcc.Store(id='output-delta'),  # Tokens of the figures last sent, see pages/delta.py
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("User Provided Fields"),
+                    dbc.CardBody([
+                        html.Div([
+                            html.Strong("Latitude: "),
+                            html.Span(id='display-lat')
+                        ], className="mb-2"),
+                        html.Div([
+                            html.Strong("Longitude: "),
+                            html.Span(id='display-lon')
+                        ], className="mb-2"),
+                        html.Div([
+                            html.Strong("Dataset: "),
+                            html.Span(id='display-dataset')
+                        ], className="mb-2"),
+                        html.Div([
+                            html.Strong("Country: "),
+                            html.Span(id='display-country')
+                        ], className="mb-2"),
+                    ])
                 ])
-            ])
-        ], md=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Location Map"),
-                dbc.CardBody([
-                    html.Div(id='map-container')  # We'll fill this in via callback
+            ], md=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Location Map"),
+                    dbc.CardBody([
+                        html.Div(id='map-container')  # We'll fill this in via callback
+                    ])
                 ])
-            ])
-        ], md=9)
-    ], className="mb-4"),
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Country Data"),
-                dbc.CardBody([
-                    html.Div([
-                        html.Strong("Total GDP: "),
-                        html.Span(id="country-total-gdp")
-                    ], className="mb-2"),
-                    html.Div([
-                        html.Strong("Total Population: "),
-                        html.Span(id="country-total-pop")
-                    ], className="mb-2"),
-                    html.Div([
-                        html.Strong("Average Life Expectancy: "),
-                        html.Span(id="country-avg-lifeexp")
-                    ], className="mb-2"),
+            ], md=9)
+        ], className="mb-4"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Country Data"),
+                    dbc.CardBody([
+                        html.Div([
+                            html.Strong("Total GDP: "),
+                            html.Span(id="country-total-gdp")
+                        ], className="mb-2"),
+                        html.Div([
+                            html.Strong("Total Population: "),
+                            html.Span(id="country-total-pop")
+                        ], className="mb-2"),
+                        html.Div([
+                            html.Strong("Average Life Expectancy: "),
+                            html.Span(id="country-avg-lifeexp")
+                        ], className="mb-2"),
+                    ])
                 ])
-            ])
-        ], md=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Visualizations"),
-                dbc.CardBody([
-                    html.Div(id='graph-container')
+            ], md=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Visualizations"),
+                    dbc.CardBody([
+                        html.Div(id='graph-container')
+                    ])
                 ])
-            ])
-        ], md=9)
-    ], className="mb-4"),
-    dbc.Row([
-        dbc.Col([
-            html.Div(className="mt-4 text-center", children=[
-                dbc.Button("Back to Input", href="/input", color="primary", className="mr-2"),
-                dbc.Button("New Analysis", href="/", color="secondary"),
-                html.A("Logout", href="/logout", className="btn btn-danger ml-2")
-            ])
-        ], width=12)
-    ])
-], className="mt-5")
-
-def update_output(data):
-    """
-    Updates the Output page fields and visualizations
-    based on the stored user data (lat, lon, dataset, country).
-    """
-    if not data:
-        # If no data is submitted yet, show placeholders
-        return [
-            '', '', '', '',
-            dbc.Alert("No data submitted!", color="danger"),
-            dbc.Alert("No data submitted!", color="danger"),
-            "", "", ""
-        ]
-
-    lat = data.get('lat', 'N/A')
-    lon = data.get('lon', 'N/A')
-    dataset = data.get('dataset', '').title()
-    country = data.get('country', 'N/A')
+            ], md=9)
+        ], className="mb-4"),
+        dbc.Row([
+            dbc.Col([
+                html.Div(className="mt-4 text-center", children=[
+                    dbc.Button("Back to Input", href="/input", color="primary", className="mr-2"),
+                    dbc.Button("New Analysis", href="/", color="secondary"),
+                    html.A("Logout", href="/logout", className="btn btn-danger ml-2")
+                ])
+            ], width=12)
+        ])
+    ], className="mt-5")
 
-    # Create a map figure
-    try:
-        lat_val = float(lat)
-        lon_val = float(lon)
-        map_fig = px.scatter_mapbox(
-            lat=[lat_val],
-            lon=[lon_val],
-            zoom=5,
-            height=300
-        )
-        map_fig.update_layout(
-            mapbox_style="open-street-map",
-            margin={"r":0,"t":0,"l":0,"b":0}
-        )
-        map_div = dcc.Graph(figure=map_fig)
-    except:
-        map_div = dbc.Alert("Invalid coordinates for map", color="danger")
+# Figure builders (results are memoised in figure_cache)
 
-    # Prepare visualizations
-    graphs = []
-    total_gdp = "N/A"
-    total_pop = "N/A"
-    avg_life = "N/A"
-
-    if data['dataset'] == 'gapminder':
-        country_data = gapminder_df[gapminder_df['country'] == country]
-        if country_data.empty:
-            graphs = dbc.Alert("Country not found in GapMinder dataset!", color="warning")
-        else:
-            # Build bar charts for population, lifeExp, and gdpPercap
-            metrics = {
-                'pop': 'Population',
-                'lifeExp': 'Life Expectancy',
-                'gdpPercap': 'GDP per Capita'
-            }
-            all_graphs = []
-            for col in metrics:
-                fig = px.bar(
-                    country_data,
-                    x='year',
-                    y=col,
-                    labels={col: metrics[col], 'year': 'Year'},
-                    template='plotly_white',
-                    text_auto=True,
-                    color_discrete_sequence=['#636EFA']
-                )
-                fig.update_layout(xaxis={'type': 'category'}, showlegend=False)
-                all_graphs.append(
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.H5(f"{metrics[col]} Trend", className="card-title"),
-                            dcc.Graph(figure=fig)
-                        ])
-                    ], className="mb-4")
-                )
-            graphs = all_graphs
+def build_map_figure(lat_val, lon_val):
+    """
+    Builds the single-marker Location Map figure. Its OpenStreetMap tiles come
+    through the app's own tile cache (pages/tiles.py), not the public servers.
+    """
+    import plotly.express as px  # Deferred: only needed on a figure cache miss
+    map_fig = px.scatter_mapbox(
+        lat=[lat_val],
+        lon=[lon_val],
+        zoom=5,
+        height=300
+    )
+    map_fig.update_layout(
+        mapbox_style="white-bg",
+        mapbox_layers=[{
+            'below': 'traces',
+            'sourcetype': 'raster',
+            'source': [TILE_URL],
+            'sourceattribution': '\u00a9 OpenStreetMap contributors'
+        }],
+        margin={"r":0,"t":0,"l":0,"b":0}
+    )
+    return map_fig
+
+def build_metric_figure(country_data, col, label):
+    """
+    Builds the per-year bar chart of one metric for one country.
+    """
+    import plotly.express as px
+    fig = px.bar(
+        country_data,
+        x='year',
+        y=col,
+        labels={col: label, 'year': 'Year'},
+        template='plotly_white',
+        text_auto=True,
+        color_discrete_sequence=['#636EFA']
+    )
+    fig.update_layout(xaxis={'type': 'category'}, showlegend=False)
+    return fig
+
+def build_scatter_figure(source):
+    """
+    Builds a registered dataset's default scatter plot.
+    """
+    import plotly.express as px
+    return px.scatter(source.df, template='plotly_white', **source.plot)
 
-            # Calculate total GDP, total population, average life expectancy
-            country_data['totalGDP'] = country_data['pop'] * country_data['gdpPercap']
-            total_gdp = f"{country_data['totalGDP'].sum():,.2f}"
-            total_pop = f"{country_data['pop'].sum():,.0f}"
-            avg_life = f"{country_data['lifeExp'].mean():,.2f}"
-
-    elif data['dataset'] == 'iris':
-        # Show a scatter plot for the iris dataset
-        fig = px.scatter(
-            iris_df,
-            x='sepal_length',
-            y='petal_length',
-            color='species',
-            labels={'sepal_length': 'Sepal Length', 'petal_length': 'Petal Length'},
-            template='plotly_white'
-        )
-        graphs = [dcc.Graph(figure=fig)]
+# Page routing: skeletons are serialized once and served from layout_cache
 
-    return [
-        lat,
-        lon,
-        dataset,
-        country,
-        map_div,
-        graphs,
-        total_gdp,
-        total_pop,
-        avg_life
-    ]
+layout_cache = LayoutCache('page-content', 'children', registry.generation)
+layout_cache.register('/input', input_layout)
+layout_cache.register('/output', output_layout)
+layout_cache.register('/', about_layout, default=True)
+layout_cache.install(app)
 
 # Callbacks
 
@@ -204,29 +169,20 @@ def update_output(data):
 def display_page(pathname):
     """
     Determines which page layout to display based on the URL pathname.
+    Normally answered by layout_cache before Dash gets here.
     """
-    if pathname == '/input':
-        return input_layout
-    elif pathname == '/output':
-        return output_layout
-    return about_layout
+    return layout_cache.layout(pathname)
 
-@callback(
-    Output('store-data', 'data'),
-    Input('submit-button', 'n_clicks'),
-    State('lat-input', 'value'),
-    State('lon-input', 'value'),
-    State('dataset-select', 'value'),
-    prevent_initial_call=True
-)
+@metrics.timed('store_data')
 def store_data(n_clicks, lat, lon, dataset):
     """
-    Stores user inputs (lat, lon, dataset, and detected country) in dcc.Store.
-    Uses geopy to reverse geocode the latitude/longitude if 'gapminder' is chosen.
+    Builds the dcc.Store payload (lat, lon, dataset, and detected country).
+    Reverse geocodes the latitude/longitude offline if 'gapminder' is chosen.
+    Runs on the background job queue, see queue_store_data.
     """
     detected_country = 'N/A'
     if dataset == 'gapminder':
-        geolocator = Nominatim(user_agent="dash_app")
+        geolocator = get_cached_geocoder()
         try:
             location = geolocator.reverse((lat, lon), language='en')
             if location:
@@ -241,6 +197,50 @@ def store_data(n_clicks, lat, lon, dataset):
         'country': detected_country
     }
 
+@callback(
+    Output('geocode-job', 'data'),
+    Output('geocode-poll', 'disabled'),
+    Output('geocode-status', 'children'),
+    Input('submit-button', 'n_clicks'),
+    State('lat-input', 'value'),
+    State('lon-input', 'value'),
+    State('dataset-select', 'value'),
+    prevent_initial_call=True
+)
+def queue_store_data(n_clicks, lat, lon, dataset):
+    """
+    Queues store_data as a background job and starts polling for its result.
+    A newer submit from the same session cancels the pending one.
+    """
+    job_id = job_queue.submit(session_id(), store_data, n_clicks, lat, lon, dataset)
+    status = dbc.Alert([dbc.Spinner(size="sm"), " Detecting country\u2026"], color="info", className="mt-2")
+    return {'id': job_id}, False, status
+
+@callback(
+    Output('store-data', 'data'),
+    Output('geocode-poll', 'disabled', allow_duplicate=True),
+    Output('geocode-status', 'children', allow_duplicate=True),
+    Input('geocode-poll', 'n_intervals'),
+    State('geocode-job', 'data'),
+    prevent_initial_call=True
+)
+def collect_store_data(n_intervals, job):
+    """
+    Fills store-data once the background job finishes.
+    """
+    if not job:
+        return dash.no_update, True, None
+    state, result = job_queue.poll(job['id'])
+    if state == PENDING:
+        return dash.no_update, False, dash.no_update
+    if state == CANCELLED:
+        return dash.no_update, True, None
+    if state == UNKNOWN:
+        # Expired before it was collected, e.g. lost with a restarted worker
+        status = dbc.Alert("Country detection timed out, please submit again.", color="warning", className="mt-2")
+        return dash.no_update, True, status
+    return result, True, None
+
 @callback(
     [
         Output('display-lat', 'children'),
@@ -251,14 +251,17 @@ def store_data(n_clicks, lat, lon, dataset):
         Output('graph-container', 'children'),
         Output('country-total-gdp', 'children'),
         Output('country-total-pop', 'children'),
-        Output('country-avg-lifeexp', 'children')
+        Output('country-avg-lifeexp', 'children'),
+        Output('output-delta', 'data')
     ],
-    Input('store-data', 'data')
+    Input('store-data', 'data'),
+    State('output-delta', 'data')
 )
-def update_output(data):
+def update_output(data, delta_tokens=None):
     """
     Updates the Output page fields and visualizations
     based on the stored user data (lat, lon, dataset, country).
+    The map and graphs go out as Patches when only their data changed.
     """
     if not data:
         # If no data is submitted yet, show placeholders
@@ -266,7 +269,7 @@ def update_output(data):
             '', '', '', '',
             dbc.Alert("No data submitted!", color="danger"),
             dbc.Alert("No data submitted!", color="danger"),
-            "", "", ""
+            "", "", "", None
         ]
 
     lat = data.get('lat', 'N/A')
@@ -278,15 +281,9 @@ def update_output(data):
     try:
         lat_val = float(lat)
         lon_val = float(lon)
-        map_fig = px.scatter_mapbox(
-            lat=[lat_val],
-            lon=[lon_val],
-            zoom=5,
-            height=300
-        )
-        map_fig.update_layout(
-            mapbox_style="open-street-map",
-            margin={"r":0,"t":0,"l":0,"b":0}
+        map_fig = figure_cache.get_or_build(
+            ('map', lat_val, lon_val),
+            lambda: build_map_figure(lat_val, lon_val)
         )
         map_div = dcc.Graph(figure=map_fig)
     except:
@@ -298,57 +295,55 @@ def update_output(data):
     total_pop = "N/A"
     avg_life = "N/A"
 
-    if data['dataset'] == 'gapminder':
-        country_data = gapminder_df[gapminder_df['country'] == country]
-        if country_data.empty:
-            graphs = dbc.Alert("Country not found in GapMinder dataset!", color="warning")
+    source = registry.get(data.get('dataset'))
+    if source is not None and 'country' in source.index_builders:
+        figure_cache.set_version(source.version)
+        country_index = source.index('country')
+        rows = country_index.rows(country)
+        if rows is None:
+            graphs = dbc.Alert(f"Country not found in {source.label} dataset!", color="warning")
         else:
             # Build bar charts for population, lifeExp, and gdpPercap
-            metrics = {
+            labels = {
                 'pop': 'Population',
                 'lifeExp': 'Life Expectancy',
                 'gdpPercap': 'GDP per Capita'
             }
+            country_data = source.df.iloc[rows]
             all_graphs = []
-            for col in metrics:
-                fig = px.bar(
-                    country_data,
-                    x='year',
-                    y=col,
-                    labels={col: metrics[col], 'year': 'Year'},
-                    template='plotly_white',
-                    text_auto=True,
-                    color_discrete_sequence=['#636EFA']
+            for col in labels:
+                fig = figure_cache.get_or_build(
+                    ('bar', source.name, country, col),
+                    lambda: build_metric_figure(country_data, col, labels[col])
                 )
-                fig.update_layout(xaxis={'type': 'category'}, showlegend=False)
                 all_graphs.append(
                     dbc.Card([
                         dbc.CardBody([
-                            html.H5(f"{metrics[col]} Trend", className="card-title"),
+                            html.H5(f"{labels[col]} Trend", className="card-title"),
                             dcc.Graph(figure=fig)
                         ])
                     ], className="mb-4")
                 )
             graphs = all_graphs
 
-            # Calculate total GDP, total population, average life expectancy
-            country_data['totalGDP'] = country_data['pop'] * country_data['gdpPercap']
-            total_gdp = f"{country_data['totalGDP'].sum():,.2f}"
-            total_pop = f"{country_data['pop'].sum():,.0f}"
-            avg_life = f"{country_data['lifeExp'].mean():,.2f}"
-
-    elif data['dataset'] == 'iris':
-        # Show a scatter plot for the iris dataset
-        fig = px.scatter(
-            iris_df,
-            x='sepal_length',
-            y='petal_length',
-            color='species',
-            labels={'sepal_length': 'Sepal Length', 'petal_length': 'Petal Length'},
-            template='plotly_white'
+            # Total GDP, total population, average life expectancy: one row of the materialized summary
+            summary = source.index('summary').row(country)
+            total_gdp = f"{summary['total_gdp']:,.2f}"
+            total_pop = f"{summary['total_pop']:,.0f}"
+            avg_life = f"{summary['mean_lifeExp']:,.2f}"
+
+    elif source is not None and source.plot:
+        # Show the dataset's registered scatter plot (e.g. iris)
+        fig = figure_cache.get_or_build(
+            ('scatter', source.name, source.version),
+            lambda: build_scatter_figure(source)
         )
         graphs = [dcc.Graph(figure=fig)]
 
+    delta_tokens = delta_tokens or {}
+    map_div, map_token = delta_tracker.update('map-container', delta_tokens.get('map'), map_div)
+    graphs, graphs_token = delta_tracker.update('graph-container', delta_tokens.get('graphs'), graphs)
+
     return [
         lat,
         lon,
@@ -358,74 +353,191 @@ def update_output(data):
         graphs,
         total_gdp,
         total_pop,
-        avg_life
+        avg_life,
+        {'map': map_token, 'graphs': graphs_token}
     ]
 
-# Callbacks for Filtering & CSV
+# Callbacks for Filtering (the CSV export route lives in pages/export.py)
+
+def filter_rows(pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries):
+    """
+    Row ids of the gapminder dataset within the population and life expectancy
+    ranges and, if any are selected, in one of the selected countries. Shared
+    with the downloads through pages/filter_cache.py; the array is read-only.
+    """
+    source = registry['gapminder']
+    filter_cache.set_version(source.version)
+    return filter_cache.query(
+        source.index('query'),
+        ranges={'pop': (pop_min, pop_max), 'lifeExp': (lifeexp_min, lifeexp_max)},
+        keys={'country': selected_countries}
+    )
 
 @callback(
+    Output('pop-min-input', 'value'),
+    Output('pop-max-input', 'value'),
+    Output('lifeexp-min-input', 'value'),
+    Output('lifeexp-max-input', 'value'),
+    Output('country-dropdown', 'options'),
+    Output('gapminder-table-source', 'data'),
+    Output('gapminder-table', 'page_action'),
+    Output('gapminder-table', 'filter_action'),
+    Output('gapminder-table', 'sort_action'),
+    Input('about-init', 'data')
+)
+def fill_about_filters(_):
+    """
+    Fills the About page filter defaults (full data range) and country options,
+    and picks where the table is filtered (see clientside_table_source).
+    """
+    source = registry['gapminder']
+    query = source.index('query')
+    pop = query.sorted['pop']
+    life_exp = query.sorted['lifeExp']
+    countries = sorted(query.postings['country'])
+    table_source = clientside_table_source(source.version)
+    action = 'custom' if table_source['columns'] is None else 'native'
+    return (
+        int(pop[0]),
+        int(pop[-1]),
+        float(life_exp[0]),
+        float(life_exp[-1]),
+        [{'label': c, 'value': c} for c in countries],
+        table_source,
+        action,
+        action,
+        action
+    )
+
+# Columns shown in gapminder-table; everything else stays on the server
+TABLE_COLUMNS = ['country', 'continent', 'year', 'pop', 'lifeExp']
+
+# Datasets up to this many rows are shipped to the browser once and filtered there
+CLIENTSIDE_FILTER_MAX_ROWS = int(os.environ.get('CLIENTSIDE_FILTER_MAX_ROWS', 5000))
+
+@lru_cache(maxsize=2)
+def clientside_table_source(version):
+    """
+    Returns the gapminder-table-source payload for the current data (version keys the cache).
+    Small datasets get their TABLE_COLUMNS as columnar arrays, text columns as
+    dictionary codes plus values; larger ones get columns=None, which keeps
+    filtering, sorting and paging on the server.
+    """
+    import pandas as pd
+    df = registry['gapminder'].df
+    if len(df) > CLIENTSIDE_FILTER_MAX_ROWS:
+        return {'columns': None}
+    columns = {}
+    for col in TABLE_COLUMNS:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            columns[col] = [None if v != v else v for v in values.tolist()]  # NaN never matches a range
+        else:
+            codes, uniques = pd.factorize(values)
+            columns[col] = {'codes': codes.tolist(), 'values': uniques.tolist()}
+    return {'columns': columns, 'order': TABLE_COLUMNS, 'n': len(df)}
+
+# Same filter semantics as QueryEngine.query: inclusive bounds, a range with either
+# bound set excludes missing values, and no selected countries means all countries.
+# Without columns it hands the filters to update_gapminder_table instead.
+clientside_callback(
+    """
+    function(popMin, popMax, lifeExpMin, lifeExpMax, countries, pageCurrent, pageSize, sortBy, filterQuery, source) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!source) {
+            return [noUpdate, noUpdate];  // Mode not decided yet (fill_about_filters pending)
+        }
+        if (!source.columns) {
+            return [noUpdate, {
+                pop_min: popMin, pop_max: popMax, lifeexp_min: lifeExpMin, lifeexp_max: lifeExpMax,
+                selected_countries: countries, page_current: pageCurrent, page_size: pageSize,
+                sort_by: sortBy, filter_query: filterQuery
+            }];
+        }
+        const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+        if (triggered.length && triggered.every(id => id.startsWith('gapminder-table.'))) {
+            return [noUpdate, noUpdate];  // Paging, sorting and the filter row are native here
+        }
+        const cols = source.columns;
+        const inRange = (v, lo, hi) => (lo == null && hi == null) ||
+            (v !== null && (lo == null || v >= lo) && (hi == null || v <= hi));
+        const selected = countries && countries.length ? new Set(countries) : null;
+        const rows = [];
+        for (let i = 0; i < source.n; i++) {
+            if (!inRange(cols.pop[i], popMin, popMax) || !inRange(cols.lifeExp[i], lifeExpMin, lifeExpMax)) {
+                continue;
+            }
+            if (selected && !selected.has(cols.country.values[cols.country.codes[i]])) {
+                continue;
+            }
+            const row = {};
+            for (const name of source.order) {
+                const col = cols[name];
+                row[name] = Array.isArray(col) ? col[i] : col.values[col.codes[i]];
+            }
+            rows.push(row);
+        }
+        return [rows, noUpdate];
+    }
+    """,
     Output('gapminder-table', 'data'),
+    Output('gapminder-table-query', 'data'),
     Input('pop-min-input', 'value'),
     Input('pop-max-input', 'value'),
     Input('lifeexp-min-input', 'value'),
     Input('lifeexp-max-input', 'value'),
-    Input('country-dropdown', 'value')
+    Input('country-dropdown', 'value'),
+    Input('gapminder-table', 'page_current'),
+    Input('gapminder-table', 'page_size'),
+    Input('gapminder-table', 'sort_by'),
+    Input('gapminder-table', 'filter_query'),
+    Input('gapminder-table-source', 'data')
 )
-def update_gapminder_table(pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries):
+
+def table_row_key(record):
     """
-    Filter the gapminder_df based on the numeric filters for population and life expectancy,
-    and update the DataTable.
+    Identifies a gapminder-table row for delta updates.
     """
-    filtered_df = gapminder_df.copy()
-
-    # Filter by population
-    filtered_df = filtered_df[
-        (filtered_df['pop'] >= pop_min) &
-        (filtered_df['pop'] <= pop_max)
-    ]
-
-    # Filter by life expectancy
-    filtered_df = filtered_df[
-        (filtered_df['lifeExp'] >= lifeexp_min) &
-        (filtered_df['lifeExp'] <= lifeexp_max)
-    ]
-
-    # Filter by selected countries (if any)
-    if selected_countries:
-        filtered_df = filtered_df[filtered_df['country'].isin(selected_countries)]
+    return record['country'], record['year']
 
-    return filtered_df.to_dict('records')
+def gapminder_table_page(pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries,
+                         page_current=0, page_size=10, sort_by=None, filter_query='', delta_token=None):
+    """
+    Filter the gapminder_df based on the numeric filters for population and life expectancy,
+    apply the table's own filter row and sort order, and return only the visible page.
+    Rows go out as a Patch of inserts and removals when that is smaller.
+    """
+    rows = filter_rows(pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries)
+    filtered_df = registry['gapminder'].df.iloc[rows]
+
+    # DataTable filter row and column sorting; stop early once a newer request is waiting
+    request_coalescer.check()
+    filtered_df = apply_filter_query(filtered_df, filter_query)
+    request_coalescer.check()
+    filtered_df = apply_sort(filtered_df, sort_by)
+    request_coalescer.check()
+
+    records, page_count = page_records(filtered_df[TABLE_COLUMNS], page_current, page_size)
+    records, delta_token = delta_tracker.update(
+        'gapminder-table', delta_token, records, lambda old, new, patch: records_delta(old, new, patch, table_row_key)
+    )
+    return records, page_count, delta_token
 
 @callback(
-    Output('download-dataframe-csv', 'data'),
-    Input('download-btn', 'n_clicks'),
-    State('pop-min-input', 'value'),
-    State('pop-max-input', 'value'),
-    State('lifeexp-min-input', 'value'),
-    State('lifeexp-max-input', 'value'),
-    State('country-dropdown', 'value'),
+    Output('gapminder-table', 'data', allow_duplicate=True),
+    Output('gapminder-table', 'page_count'),
+    Output('gapminder-table-delta', 'data'),
+    Input('gapminder-table-query', 'data'),
+    State('gapminder-table-delta', 'data'),
     prevent_initial_call=True
 )
-def download_filtered_csv(n_clicks, pop_min, pop_max, lifeexp_min, lifeexp_max, selected_countries):
+@request_coalescer.coalesced('update_gapminder_table')
+def update_gapminder_table(query, delta_token):
     """
-    Applies the same numeric filters and returns a CSV for download.
+    Server-side table path, fed by the clientside callback above with the
+    About page filters and the table's paging, sort and filter row. Requests
+    superseded by a newer one from the same session are dropped.
     """
-    filtered_df = gapminder_df.copy()
-
-    # Filter by population
-    filtered_df = filtered_df[
-        (filtered_df['pop'] >= pop_min) &
-        (filtered_df['pop'] <= pop_max)
-    ]
-
-    # Filter by life expectancy
-    filtered_df = filtered_df[
-        (filtered_df['lifeExp'] >= lifeexp_min) &
-        (filtered_df['lifeExp'] <= lifeexp_max)
-    ]
-
-    # Filter by selected countries
-    if selected_countries:
-        filtered_df = filtered_df[filtered_df['country'].isin(selected_countries)]
-
-    return dcc.send_data_frame(filtered_df.to_csv, "filtered_gapminder.csv")
+    if not query:
+        raise dash.exceptions.PreventUpdate
+    return gapminder_table_page(**query, delta_token=delta_token)
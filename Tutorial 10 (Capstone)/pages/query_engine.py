@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class QueryEngine:
+    """
+    Read-only columnar index over a DataFrame for the About page filters.
+
+    Built once at load time:
+      * range columns keep a sorted permutation, so a [lo, hi] predicate is
+        two binary searches returning the matching row ids directly;
+      * key columns keep a posting list (sorted row ids) per distinct value.
+
+    A query sizes every predicate first (O(log n) each), materialises only the
+    most selective one and checks the remaining predicates on those candidate
+    rows, so the cost follows the number of matching rows, not the row count.
+    """
+
+    def __init__(self, df, range_columns=('pop', 'lifeExp'), key_columns=('country',)):
+        import pandas as pd
+        self.df = df
+        self.values = {}
+        self.order = {}
+        self.sorted = {}
+        for col in range_columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind='stable')
+            valid = np.count_nonzero(~np.isnan(values))  # NaNs sort last and never match
+            self.values[col] = values
+            self.order[col] = order[:valid]
+            self.sorted[col] = values[order[:valid]]
+        self.codes = {}
+        self.postings = {}
+        for col in key_columns:
+            codes, uniques = pd.factorize(df[col], sort=False)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.codes[col] = (codes, {v: i for i, v in enumerate(uniques)})
+            self.postings[col] = {
+                v: order[bounds[i]:bounds[i + 1]] for i, v in enumerate(uniques)
+            }
+
+    def __len__(self):
+        return len(self.df)
+
+    def range_rows(self, col, lo=None, hi=None):
+        """
+        Returns row ids with lo <= df[col] <= hi (either bound may be None), in index order.
+        """
+        start, stop = self._range_bounds(col, lo, hi)
+        return np.sort(self.order[col][start:stop])
+
+    def key_rows(self, col, values):
+        """
+        Returns row ids whose df[col] is one of values, in index order.
+        """
+        postings = self.postings[col]
+        parts = [postings[v] for v in dict.fromkeys(values) if v in postings]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(parts))
+
+    def _range_bounds(self, col, lo, hi):
+        keys = self.sorted[col]
+        start = 0 if lo is None else int(np.searchsorted(keys, lo, side='left'))
+        stop = len(keys) if hi is None else int(np.searchsorted(keys, hi, side='right'))
+        return start, max(start, stop)
+
+    def query(self, ranges=None, keys=None):
+        """
+        Returns sorted row ids matching every predicate.
+
+        ranges: {column: (lo, hi)}; keys: {column: iterable of accepted values}.
+        A key predicate with an empty or None value list is ignored.
+        """
+        ranges = {c: b for c, b in (ranges or {}).items() if b != (None, None)}
+        keys = {c: list(dict.fromkeys(v)) for c, v in (keys or {}).items() if v}
+        # Size every predicate without materialising it
+        candidates = []
+        for col, (lo, hi) in ranges.items():
+            start, stop = self._range_bounds(col, lo, hi)
+            candidates.append((stop - start, 'range', col))
+        for col, values in keys.items():
+            postings = self.postings[col]
+            candidates.append((sum(len(postings[v]) for v in values if v in postings), 'key', col))
+        if not candidates:
+            return np.arange(len(self.df))
+        candidates.sort(key=lambda c: c[0])
+        _, kind, col = candidates[0]
+        if kind == 'range':
+            rows = self.range_rows(col, *ranges[col])
+        else:
+            rows = self.key_rows(col, keys[col])
+        # Check the remaining predicates only on the surviving rows
+        for _, kind, other in candidates[1:]:
+            if not len(rows):
+                break
+            if kind == 'range':
+                lo, hi = ranges[other]
+                values = self.values[other][rows]
+                mask = ~np.isnan(values)
+                if lo is not None:
+                    mask &= values >= lo
+                if hi is not None:
+                    mask &= values <= hi
+            else:
+                codes, lookup = self.codes[other]
+                wanted = [lookup[v] for v in keys[other] if v in lookup]
+                mask = np.isin(codes[rows], wanted)
+            rows = rows[mask]
+        return rows
+
+    def frame(self, rows):
+        """
+        Returns the DataFrame rows for a row-id array.
+        """
+        return self.df.iloc[rows]
@@ -0,0 +1,270 @@
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from pages.geocoder import DATA_DIR
+
+# Server-side session settings (overridable through the environment)
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite')  # 'sqlite', 'file' or 'memory'
+SESSION_PATH = os.environ.get('SESSION_PATH')  # Defaults per backend, see make_store
+SESSION_MEMORY_SIZE = int(os.environ.get('SESSION_MEMORY_SIZE', 10000))
+SESSION_RECHECK = float(os.environ.get('SESSION_RECHECK', 5))  # Seconds a worker trusts its in-memory copy
+SESSION_PURGE_INTERVAL = float(os.environ.get('SESSION_PURGE_INTERVAL', 600))
+
+# Cookie values are opaque random ids; anything else is ignored without a lookup
+_SID = re.compile(r'^[A-Za-z0-9_-]{22}$')
+
+
+class SqliteSessionStore:
+    """
+    Sessions as rows of one SQLite table, shared by every worker on the host.
+    The connection is opened on first use in each process, so a store created
+    before a pre-fork server forks is safe to inherit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS session (sid TEXT PRIMARY KEY, data TEXT, expires REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS session_expires ON session (expires)')
+            self._db.commit()
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, sid):
+        with self._lock:
+            return self._connection().execute('SELECT data, expires FROM session WHERE sid = ?', (sid,)).fetchone()
+
+    def put(self, sid, data, expires):
+        with self._lock:
+            db = self._connection()
+            db.execute('INSERT OR REPLACE INTO session (sid, data, expires) VALUES (?, ?, ?)', (sid, data, expires))
+            db.commit()
+
+    def delete(self, sid):
+        with self._lock:
+            db = self._connection()
+            db.execute('DELETE FROM session WHERE sid = ?', (sid,))
+            db.commit()
+
+    def purge(self, now):
+        with self._lock:
+            db = self._connection()
+            db.execute('DELETE FROM session WHERE expires < ?', (now,))
+            db.commit()
+
+
+class FileSessionStore:
+    """
+    Sessions as one JSON file each in a directory, for hosts without SQLite
+    or a directory shared between nodes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, f'{sid}.json')
+
+    def get(self, sid):
+        try:
+            with open(self._path(sid)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record['data'], record['expires']
+
+    def put(self, sid, data, expires):
+        tmp = f'{self._path(sid)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'data': data, 'expires': expires}, f)
+        os.replace(tmp, self._path(sid))  # Readers never see a partial file
+
+    def delete(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, now):
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            record = self.get(name[:-len('.json')])
+            if record is not None and record[1] < now:
+                self.delete(name[:-len('.json')])
+
+
+class SessionCache:
+    """
+    In-memory LRU in front of a session store.
+
+    A hit younger than ``recheck`` seconds is answered from memory, which makes
+    the per-request session lookup (and so require_login) a dict access. Older
+    entries are re-read from the store, so a logout or revocation in another
+    worker takes effect here within ``recheck`` seconds. Writes go through to
+    the store immediately. With ``store=None`` sessions live in this process only.
+    """
+
+    def __init__(self, store, memory_size=SESSION_MEMORY_SIZE, recheck=SESSION_RECHECK,
+                 purge_interval=SESSION_PURGE_INTERVAL):
+        self.store = store
+        self.memory_size = memory_size
+        self.recheck = recheck
+        self.purge_interval = purge_interval
+        self.serializer = TaggedJSONSerializer()
+        self._memory = OrderedDict()  # sid -> (data, expires, checked_at)
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+
+    def get(self, sid):
+        """
+        Returns a copy of the session's data, or None if it is unknown or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(sid)
+            if entry is not None and (self.store is None or now - entry[2] < self.recheck):
+                if entry[1] > now:
+                    self._memory.move_to_end(sid)
+                    return dict(entry[0])
+                del self._memory[sid]
+                return None
+        if self.store is None:
+            return None
+        row = self.store.get(sid)
+        if row is None or row[1] <= now:
+            with self._lock:
+                self._memory.pop(sid, None)
+            return None
+        data = self.serializer.loads(row[0])
+        self._remember(sid, data, row[1], now)
+        return dict(data)
+
+    def put(self, sid, data, expires):
+        now = time.time()
+        self._remember(sid, dict(data), expires, now)
+        if self.store is None:
+            return
+        self.store.put(sid, self.serializer.dumps(dict(data)), expires)
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.store.purge(now)
+
+    def delete(self, sid):
+        with self._lock:
+            self._memory.pop(sid, None)
+        if self.store is not None:
+            self.store.delete(sid)
+
+    def _remember(self, sid, data, expires, now):
+        with self._lock:
+            self._memory[sid] = (data, expires, now)
+            self._memory.move_to_end(sid)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    Session dict whose contents live server-side under ``sid``.
+    """
+
+    def __init__(self, initial=None, sid=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Flask session interface keeping session data in a SessionCache; the cookie
+    only carries a random 22-character id, so sessions can be revoked and are
+    shared by every worker using the same store.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID.match(sid):
+            data = self.cache.get(sid)
+            if data is not None:
+                return ServerSession(data, sid)
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified and session.sid:
+                self.cache.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(16)
+        self.cache.put(session.sid, session, time.time() + app.permanent_session_lifetime.total_seconds())
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def rotate_session(session):
+    """
+    Gives the current session a fresh id on its next save (call on login to
+    prevent session fixation). The old id stops working immediately.
+    """
+    if session.sid is not None:
+        from flask import current_app
+        current_app.session_interface.cache.delete(session.sid)
+        session.sid = None
+    session.modified = True
+
+
+def make_store(backend=SESSION_BACKEND, path=SESSION_PATH):
+    """
+    Builds the configured session store; 'memory' means no shared store.
+    """
+    if backend == 'sqlite':
+        return SqliteSessionStore(path or os.path.join(DATA_DIR, 'sessions.sqlite3'))
+    if backend == 'file':
+        return FileSessionStore(path or os.path.join(DATA_DIR, 'sessions'))
+    if backend == 'memory':
+        return None
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}; expected 'sqlite', 'file' or 'memory'.")
+
+
+def make_session_interface():
+    """
+    Returns the session interface for the configured backend.
+    """
+    return ServerSessionInterface(SessionCache(make_store()))
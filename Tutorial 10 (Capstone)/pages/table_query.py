@@ -0,0 +1,121 @@
+import math
+import re
+
+# Server-side query path for DataTables running with
+# page_action / filter_action / sort_action = 'custom'.
+
+# One "{column} operator value" clause of a DataTable filter_query
+_CLAUSE = re.compile(
+    r"""^\s*\{(?P<column>[^}]+)\}\s*
+        (?P<op>[a-z]+|[<>!=]=?)\s*
+        (?P<value>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`|.*?)\s*$""",
+    re.VERBOSE
+)
+
+# Symbolic spellings of the relational operators
+_SYMBOLS = {'=': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge'}
+
+_OPERATORS = {'eq', 'ne', 'lt', 'le', 'gt', 'ge', 'contains', 'datestartswith'}
+
+
+def parse_filter_query(filter_query):
+    """
+    Translates a DataTable filter_query string into a list of
+    (column, operator, value, case_sensitive) tuples.
+
+    Only the '&&'-joined clauses the DataTable filter row generates are
+    supported; clauses that do not parse are ignored, matching the
+    behaviour of the native filter on invalid input.
+    """
+    clauses = []
+    if not filter_query:
+        return clauses
+    for part in filter_query.split(' && '):
+        match = _CLAUSE.match(part.strip('() '))
+        if not match:
+            continue
+        op = _SYMBOLS.get(match['op'], match['op'])
+        case_sensitive = True
+        # 'i' / 's' prefixes select case-insensitive / case-sensitive variants
+        if op not in _OPERATORS and op[:1] in ('i', 's') and op[1:] in _OPERATORS:
+            case_sensitive = op[0] == 's'
+            op = op[1:]
+        if op not in _OPERATORS:
+            continue
+        value = match['value']
+        if value[:1] in ('"', "'", '`') and value[-1:] == value[:1] and len(value) > 1:
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        clauses.append((match['column'], op, value, case_sensitive))
+    return clauses
+
+
+def clause_mask(series, op, value, case_sensitive=True):
+    """
+    Evaluates one parsed clause against a column, returning a boolean mask.
+    """
+    import pandas as pd
+    if op in ('contains', 'datestartswith'):
+        text = series.astype(str)
+        needle = str(value)
+        if not case_sensitive:
+            text = text.str.lower()
+            needle = needle.lower()
+        if op == 'contains':
+            return text.str.contains(needle, regex=False)
+        return text.str.startswith(needle)
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return pd.Series(op == 'ne', index=series.index)
+    elif not case_sensitive:
+        series = series.astype(str).str.lower()
+        value = str(value).lower()
+    else:
+        series = series.astype(str)
+        value = str(value)
+    return {
+        'eq': series.__eq__, 'ne': series.__ne__,
+        'lt': series.__lt__, 'le': series.__le__,
+        'gt': series.__gt__, 'ge': series.__ge__,
+    }[op](value)
+
+
+def apply_filter_query(df, filter_query):
+    """
+    Returns the rows of df matching a DataTable filter_query.
+    """
+    for column, op, value, case_sensitive in parse_filter_query(filter_query):
+        if column in df.columns:
+            df = df[clause_mask(df[column], op, value, case_sensitive)]
+    return df
+
+
+def apply_sort(df, sort_by):
+    """
+    Orders df by a DataTable sort_by list ([{'column_id': ..., 'direction': ...}]).
+    """
+    sort_by = [s for s in (sort_by or []) if s.get('column_id') in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [s['column_id'] for s in sort_by],
+        ascending=[s.get('direction') != 'desc' for s in sort_by],
+        kind='stable'
+    )
+
+
+def page_records(df, page_current, page_size):
+    """
+    Returns (records on the requested page, total page count).
+    """
+    page_size = page_size or 10
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_current = min(max(page_current or 0, 0), page_count - 1)
+    start = page_current * page_size
+    return df.iloc[start:start + page_size].to_dict('records'), page_count
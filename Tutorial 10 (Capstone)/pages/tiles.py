@@ -0,0 +1,210 @@
+import os
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+
+from flask import Response, abort
+
+from pages.geocoder import DATA_DIR
+from pages.login import server
+from pages.metrics import metrics
+
+# Map tile proxy settings (overridable through the environment).
+# TILE_UPSTREAM lets tests and air-gapped deployments point at a local tile server.
+TILE_UPSTREAM = os.environ.get('TILE_UPSTREAM', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png')
+TILE_CACHE_DIR = os.environ.get('TILE_CACHE_DIR', os.path.join(DATA_DIR, 'cache', 'tiles'))
+TILE_CACHE_BYTES = int(os.environ.get('TILE_CACHE_BYTES', 512 * 1024 * 1024))
+TILE_MAX_ZOOM = int(os.environ.get('TILE_MAX_ZOOM', 19))
+TILE_TIMEOUT = float(os.environ.get('TILE_TIMEOUT', 10))
+TILE_MAX_AGE = int(os.environ.get('TILE_MAX_AGE', 24 * 3600))  # Browser cache lifetime, seconds
+# The OSM tile usage policy asks for an identifying User-Agent
+TILE_USER_AGENT = os.environ.get('TILE_USER_AGENT', 'dash-dashboard-capstone tile cache')
+
+TILE_PATH = '/tiles'
+# Tile URL template used by the Location Map; make it absolute when the app is served under a prefix
+TILE_URL = os.environ.get('TILE_URL', TILE_PATH + '/{z}/{x}/{y}.png')
+
+metrics.describe('tile_requests_total', 'counter', 'Map tile requests, by result (hit, miss, error).')
+
+
+class TileNotFound(Exception):
+    pass
+
+
+class TileCache:
+    """
+    On-disk cache of map tiles in front of an XYZ tile server.
+
+    Tiles are stored as TILE_CACHE_DIR/z/x/y.png and served from there; a
+    miss fetches the tile from ``upstream`` once, even when several requests
+    ask for it at the same time. The cache is bounded by total file size and
+    evicts the least recently used tiles: the order is rebuilt from file
+    modification times on first use and every hit touches its file, so it
+    survives restarts. Each worker process keeps its own view of the order,
+    so with several workers the directory can briefly exceed max_bytes.
+    """
+
+    def __init__(self, upstream=TILE_UPSTREAM, directory=TILE_CACHE_DIR, max_bytes=TILE_CACHE_BYTES,
+                 timeout=TILE_TIMEOUT):
+        self.upstream = upstream
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._index = None  # path -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._fetching = {}  # (z, x, y) -> lock held while the tile is fetched
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, z, x, y):
+        return os.path.join(self.directory, str(z), str(x), f'{y}.png')
+
+    def _load_index(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.png'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, path, stat.st_size))
+        files.sort()
+        self._index = OrderedDict((path, size) for _, path, size in files)
+        self._bytes = sum(self._index.values())
+
+    def _read(self, path):
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            if path not in self._index:
+                return None
+            self._index.move_to_end(path)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:  # Evicted by another worker
+            with self._lock:
+                self._bytes -= self._index.pop(path, 0)
+            return None
+        return data
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._register(path, len(data))
+
+    def _register(self, path, size):
+        evicted = []
+        with self._lock:
+            self._bytes += size - self._index.pop(path, 0)
+            self._index[path] = size
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                old_path, old_size = self._index.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_path)
+            metrics.inc('cache_evictions_total', len(evicted), cache='tile')
+            metrics.set('cache_entries', len(self._index), cache='tile')
+            metrics.set('cache_bytes', self._bytes, cache='tile')
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+
+    def fetch(self, z, x, y):
+        """
+        Returns the tile's bytes straight from upstream. Raises TileNotFound
+        when upstream has no such tile, OSError when it cannot be reached.
+        """
+        url = self.upstream.format(z=z, x=x, y=y)
+        request = urllib.request.Request(url, headers={'User-Agent': TILE_USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise TileNotFound(url) from e
+            raise
+
+    def get(self, z, x, y):
+        """
+        Returns (tile bytes, whether they came from the cache); a miss fetches
+        the tile from upstream and caches it.
+        """
+        path = self._path(z, x, y)
+        data = self._read(path)
+        if data is None:
+            key = (z, x, y)
+            with self._lock:
+                fetching = self._fetching.setdefault(key, threading.Lock())
+            with fetching:
+                try:
+                    data = self._read(path)  # Fetched by another thread meanwhile?
+                    if data is None:
+                        try:  # Or written by another worker since the index was built
+                            with open(path, 'rb') as f:
+                                data = f.read()
+                            self._register(path, len(data))
+                        except FileNotFoundError:
+                            data = self.fetch(z, x, y)
+                            self._store(path, data)
+                            with self._lock:
+                                self.misses += 1
+                            return data, False
+                finally:
+                    with self._lock:
+                        self._fetching.pop(key, None)
+        with self._lock:
+            self.hits += 1
+        return data, True
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters and the current size of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'tiles': len(self._index or ()),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+tile_cache = TileCache()
+
+
+@server.route(TILE_PATH + '/<int:z>/<int:x>/<int:y>.png')
+def serve_tile(z, x, y):
+    """
+    Serves one map tile through tile_cache. Behind the login like every other
+    page route, so the proxy is not open to the world.
+    """
+    if not 0 <= z <= TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        abort(404)
+    try:
+        data, cached = tile_cache.get(z, x, y)
+    except TileNotFound:
+        metrics.inc('tile_requests_total', result='error')
+        abort(404)
+    except OSError:
+        metrics.inc('tile_requests_total', result='error')
+        abort(502)
+    metrics.inc('tile_requests_total', result='hit' if cached else 'miss')
+    response = Response(data, mimetype='image/png')
+    response.headers['Cache-Control'] = f'public, max-age={TILE_MAX_AGE}'
+    return response
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+from pages.metrics import metrics
+
+
+class VersionedLRU:
+    """
+    LRU cache bounded by the total size of its values and tagged with a dataset version.
+
+    ``sizeof`` gives a value's size in bytes; values larger than ``max_bytes``
+    are never kept. Calling set_version with a new version drops everything
+    cached for the old one. Lookups, evictions and the current size are
+    reported through pages.metrics under ``cache=name``.
+    """
+
+    def __init__(self, name, max_bytes, sizeof=len):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.version = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_version(self, version):
+        """
+        Switches to a new dataset version, invalidating all cached values if it changed.
+        """
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self._bytes = 0
+                self.version = version
+                self._report()
+
+    def get(self, key):
+        """
+        Returns the value cached for key, or None (counted as a miss when put follows).
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc('cache_requests_total', cache=self.name, result='hit')
+            return value
+
+    def put(self, key, value):
+        """
+        Stores a freshly computed value, evicting the least recently used ones past max_bytes.
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            self.misses += 1
+            metrics.inc('cache_requests_total', cache=self.name, result='miss')
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self.sizeof(old)
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self.sizeof(evicted)
+                self.evictions += 1
+                metrics.inc('cache_evictions_total', cache=self.name)
+            self._report()
+
+    def _report(self):
+        metrics.set('cache_entries', len(self._entries), cache=self.name)
+        metrics.set('cache_bytes', self._bytes, cache=self.name)
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters and the current size of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
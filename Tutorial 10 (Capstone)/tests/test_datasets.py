@@ -0,0 +1,30 @@
+"""
+Checks that loads from the compact Arrow copy report the original compaction savings.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages import datasets  # noqa: E402
+from pages.datasets import Dataset, load_gapminder, registry  # noqa: E402
+
+
+def test_cached_load_keeps_compaction_report(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, 'DATASET_CACHE_DIR', str(tmp_path))
+    gapminder = registry['gapminder']
+
+    def fresh():
+        return Dataset('gapminder', 'GapMinder', loader=load_gapminder, schema=gapminder.schema,
+                       source=gapminder.source)
+
+    first = fresh()
+    first.df
+    assert first.memory['before'] > first.memory['after']
+    assert os.path.exists(first.cache_path)
+
+    second = fresh()
+    second.df
+    assert second.memory == first.memory
@@ -0,0 +1,36 @@
+"""
+Checks that the Arrow IPC exports are compressed and read back to the selected rows.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.datasets import registry  # noqa: E402
+from pages.export import arrow_chunks  # noqa: E402
+
+
+def uncompressed_size(table, fmt):
+    sink = pa.BufferOutputStream()
+    new_writer = pa.ipc.new_stream if fmt == 'arrow' else pa.ipc.new_file
+    with new_writer(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+@pytest.mark.parametrize('fmt', ['arrow', 'feather'])
+def test_arrow_exports_are_compressed(fmt):
+    frame = registry['gapminder'].df
+    rows = list(range(len(frame)))
+    body = pa.py_buffer(b''.join(arrow_chunks(frame, rows, fmt, chunk_rows=500)))
+    reader = pa.ipc.open_stream(body) if fmt == 'arrow' else pa.ipc.open_file(body)
+    table = reader.read_all()
+    assert table.num_rows == len(frame)
+    assert table.column('country').to_pylist() == frame['country'].astype(str).tolist()
+    # Compressed record batch bodies come out well under the plain IPC encoding of the same rows
+    assert body.size < uncompressed_size(table, fmt) * 0.8
@@ -0,0 +1,203 @@
+"""
+Round-trips every gapminder country's capital through the offline geocoder.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.geocoder import GAPMINDER_NAMES, OfflineGeocoder  # noqa: E402
+
+# (lat, lon) of each capital, in the administrative seat where a country has several
+CAPITALS = {
+    'Afghanistan': (34.53, 69.17),
+    'Albania': (41.33, 19.82),
+    'Algeria': (36.75, 3.06),
+    'Angola': (-8.84, 13.23),
+    'Argentina': (-34.60, -58.38),
+    'Australia': (-35.28, 149.13),
+    'Austria': (48.21, 16.37),
+    'Bahrain': (26.23, 50.59),
+    'Bangladesh': (23.81, 90.41),
+    'Belgium': (50.85, 4.35),
+    'Benin': (6.50, 2.60),
+    'Bolivia': (-16.50, -68.15),
+    'Bosnia and Herzegovina': (43.86, 18.41),
+    'Botswana': (-24.65, 25.91),
+    'Brazil': (-15.79, -47.88),
+    'Bulgaria': (42.70, 23.32),
+    'Burkina Faso': (12.37, -1.52),
+    'Burundi': (-3.43, 29.93),
+    'Cambodia': (11.56, 104.92),
+    'Cameroon': (3.87, 11.52),
+    'Canada': (45.42, -75.70),
+    'Central African Republic': (4.39, 18.56),
+    'Chad': (12.13, 15.06),
+    'Chile': (-33.45, -70.67),
+    'China': (39.90, 116.41),
+    'Colombia': (4.71, -74.07),
+    'Comoros': (-11.70, 43.26),
+    'Congo, Dem. Rep.': (-4.32, 15.31),
+    'Congo, Rep.': (-4.27, 15.28),
+    'Costa Rica': (9.93, -84.08),
+    "Cote d'Ivoire": (6.83, -5.29),
+    'Croatia': (45.81, 15.98),
+    'Cuba': (23.11, -82.37),
+    'Czech Republic': (50.08, 14.44),
+    'Denmark': (55.68, 12.57),
+    'Djibouti': (11.59, 43.15),
+    'Dominican Republic': (18.49, -69.93),
+    'Ecuador': (-0.18, -78.47),
+    'Egypt': (30.04, 31.24),
+    'El Salvador': (13.69, -89.22),
+    'Equatorial Guinea': (3.75, 8.78),
+    'Eritrea': (15.32, 38.93),
+    'Ethiopia': (9.03, 38.74),
+    'Finland': (60.17, 24.94),
+    'France': (48.86, 2.35),
+    'Gabon': (0.42, 9.47),
+    'Gambia': (13.45, -16.58),
+    'Germany': (52.52, 13.40),
+    'Ghana': (5.60, -0.19),
+    'Greece': (37.98, 23.73),
+    'Guatemala': (14.63, -90.51),
+    'Guinea': (9.64, -13.58),
+    'Guinea-Bissau': (11.86, -15.60),
+    'Haiti': (18.54, -72.34),
+    'Honduras': (14.07, -87.19),
+    'Hong Kong, China': (22.28, 114.16),
+    'Hungary': (47.50, 19.04),
+    'Iceland': (64.15, -21.94),
+    'India': (28.61, 77.21),
+    'Indonesia': (-6.21, 106.85),
+    'Iran': (35.69, 51.39),
+    'Iraq': (33.32, 44.37),
+    'Ireland': (53.35, -6.26),
+    'Israel': (31.77, 35.21),
+    'Italy': (41.90, 12.50),
+    'Jamaica': (18.02, -76.80),
+    'Japan': (35.68, 139.69),
+    'Jordan': (31.95, 35.93),
+    'Kenya': (-1.29, 36.82),
+    'Korea, Dem. Rep.': (39.04, 125.76),
+    'Korea, Rep.': (37.57, 126.98),
+    'Kuwait': (29.38, 47.99),
+    'Lebanon': (33.89, 35.50),
+    'Lesotho': (-29.31, 27.48),
+    'Liberia': (6.30, -10.80),
+    'Libya': (32.89, 13.19),
+    'Madagascar': (-18.88, 47.51),
+    'Malawi': (-13.96, 33.79),
+    'Malaysia': (3.14, 101.69),
+    'Mali': (12.64, -8.00),
+    'Mauritania': (18.07, -15.96),
+    'Mauritius': (-20.16, 57.50),
+    'Mexico': (19.43, -99.13),
+    'Mongolia': (47.89, 106.91),
+    'Montenegro': (42.43, 19.26),
+    'Morocco': (34.02, -6.83),
+    'Mozambique': (-25.97, 32.57),
+    'Myanmar': (19.76, 96.08),
+    'Namibia': (-22.56, 17.08),
+    'Nepal': (27.72, 85.32),
+    'Netherlands': (52.37, 4.90),
+    'New Zealand': (-41.29, 174.78),
+    'Nicaragua': (12.11, -86.24),
+    'Niger': (13.51, 2.11),
+    'Nigeria': (9.08, 7.40),
+    'Norway': (59.91, 10.75),
+    'Oman': (23.59, 58.41),
+    'Pakistan': (33.68, 73.05),
+    'Panama': (8.98, -79.52),
+    'Paraguay': (-25.26, -57.58),
+    'Peru': (-12.05, -77.04),
+    'Philippines': (14.60, 120.98),
+    'Poland': (52.23, 21.01),
+    'Portugal': (38.72, -9.14),
+    'Puerto Rico': (18.47, -66.11),
+    'Reunion': (-20.88, 55.45),
+    'Romania': (44.43, 26.10),
+    'Rwanda': (-1.94, 30.06),
+    'Sao Tome and Principe': (0.34, 6.73),
+    'Saudi Arabia': (24.71, 46.68),
+    'Senegal': (14.72, -17.47),
+    'Serbia': (44.79, 20.45),
+    'Sierra Leone': (8.48, -13.23),
+    'Singapore': (1.29, 103.85),
+    'Slovak Republic': (48.15, 17.11),
+    'Slovenia': (46.06, 14.51),
+    'Somalia': (2.05, 45.32),
+    'South Africa': (-25.75, 28.19),
+    'Spain': (40.42, -3.70),
+    'Sri Lanka': (6.93, 79.85),
+    'Sudan': (15.50, 32.56),
+    'Swaziland': (-26.31, 31.14),
+    'Sweden': (59.33, 18.07),
+    'Switzerland': (46.95, 7.45),
+    'Syria': (33.51, 36.29),
+    'Taiwan': (25.03, 121.57),
+    'Tanzania': (-6.16, 35.75),
+    'Thailand': (13.76, 100.50),
+    'Togo': (6.13, 1.22),
+    'Trinidad and Tobago': (10.65, -61.51),
+    'Tunisia': (36.81, 10.18),
+    'Turkey': (39.93, 32.86),
+    'Uganda': (0.35, 32.58),
+    'United Kingdom': (51.51, -0.13),
+    'United States': (38.91, -77.04),
+    'Uruguay': (-34.90, -56.16),
+    'Venezuela': (10.48, -66.90),
+    'Vietnam': (21.03, 105.85),
+    'West Bank and Gaza': (31.90, 35.20),
+    'Yemen, Rep.': (15.37, 44.19),
+    'Zambia': (-15.39, 28.32),
+    'Zimbabwe': (-17.83, 31.05),
+}
+
+
+@pytest.fixture(scope='module')
+def geocoder():
+    return OfflineGeocoder()
+
+
+def test_capitals_cover_gapminder():
+    import plotly.express as px
+    assert set(CAPITALS) == set(px.data.gapminder()['country'])
+
+
+@pytest.mark.parametrize('country', sorted(CAPITALS))
+def test_capital_round_trip(geocoder, country):
+    lat, lon = CAPITALS[country]
+    assert geocoder.country(lat, lon) == country
+    location = geocoder.reverse((lat, lon), language='en')
+    assert location.raw['address']['country'] == country
+    code = location.raw['address']['country_code']
+    assert len(code) == 2 and code.islower()
+
+
+def test_country_code_is_nominatim_style(geocoder):
+    assert geocoder.reverse((-33.45, -70.67)).raw['address']['country_code'] == 'cl'  # Santiago
+    assert geocoder.reverse((1.29, 103.85)).raw['address']['country_code'] == 'sg'  # Singapore
+
+
+def test_neighbours_of_small_states(geocoder):
+    assert geocoder.country(1.49, 103.74) == 'Malaysia'  # Johor Bahru
+    assert geocoder.country(22.54, 114.05) == 'China'  # Shenzhen
+    assert geocoder.country(-4.32, 15.31) == 'Congo, Dem. Rep.'  # Kinshasa
+    assert geocoder.country(25.29, 51.53) == 'Qatar'  # Doha
+
+
+def test_open_water_has_no_country(geocoder):
+    assert geocoder.country(0.0, -30.0) is None
+
+
+def test_no_abbreviated_names(geocoder):
+    names = {polygon.country for polygon in geocoder.polygons} | {area.country for area in geocoder.areas}
+    assert set(GAPMINDER_NAMES.values()) <= names
+    # Gapminder spells a few names with 'Rep.' itself; nothing else should be abbreviated
+    abbreviated = {name for name in names - set(CAPITALS) if '.' in name}
+    assert not abbreviated
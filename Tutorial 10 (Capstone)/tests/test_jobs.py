@@ -0,0 +1,80 @@
+"""
+Checks that job states are shared by every worker process using the same store.
+
+    python -m pytest tests
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.jobs import CANCELLED, DONE, PENDING, UNKNOWN, JobQueue  # noqa: E402
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state, result = queue.poll(job_id)
+        if state != PENDING:
+            return state, result
+        time.sleep(0.01)
+    return PENDING, None
+
+
+def poll_in_other_process(path, job_id, results):
+    # A fresh queue on the same store stands in for another gunicorn worker
+    results.put(wait_for(JobQueue(path), job_id))
+
+
+def submit_in_other_process(path, results):
+    results.put(JobQueue(path).submit('session', time.sleep, 0))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+
+def test_result_is_collected_once(path):
+    queue = JobQueue(path)
+    job_id = queue.submit('session', dict, country='Chile')
+    assert wait_for(queue, job_id) == (DONE, {'country': 'Chile'})
+    assert queue.poll(job_id) == (CANCELLED, None)
+    assert queue.poll('no-such-job') == (UNKNOWN, None)
+
+
+def test_poll_from_another_process(path):
+    queue = JobQueue(path)
+    job_id = queue.submit('session', dict, country='Chile')
+    results = multiprocessing.get_context('spawn').Queue()
+    process = multiprocessing.get_context('spawn').Process(target=poll_in_other_process, args=(path, job_id, results))
+    process.start()
+    process.join(30)
+    assert results.get(timeout=1) == (DONE, {'country': 'Chile'})
+    assert queue.poll(job_id) == (CANCELLED, None)
+
+
+def test_submit_in_another_process_supersedes(path):
+    queue = JobQueue(path)
+    release = threading.Event()
+    job_id = queue.submit('session', release.wait, 5)
+    results = multiprocessing.get_context('spawn').Queue()
+    process = multiprocessing.get_context('spawn').Process(target=submit_in_other_process, args=(path, results))
+    process.start()
+    process.join(30)
+    newer = results.get(timeout=1)
+    release.set()
+    assert wait_for(queue, job_id) == (CANCELLED, None)
+    assert wait_for(queue, newer) == (DONE, None)  # The other process ran it before exiting
+
+
+def test_failed_job_raises(path):
+    queue = JobQueue(path)
+    job_id = queue.submit(None, int, 'not a number')
+    with pytest.raises(RuntimeError):
+        wait_for(queue, job_id)
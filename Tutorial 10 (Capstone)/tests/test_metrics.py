@@ -0,0 +1,50 @@
+"""
+Checks how /metrics labels callback requests that do not name a server-side callback.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402,F401  Registers pages, callbacks and routes
+from pages.login import app as dash_app, server  # noqa: E402
+from pages.metrics import METRICS_PATH, UNKNOWN_CALLBACK  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def client():
+    client = server.test_client()
+    client.get(dash_app.config.routes_pathname_prefix + '_dash-dependencies').close()
+    return client
+
+
+def errors(client):
+    text = client.get(METRICS_PATH).get_data(as_text=True)
+    prefix = f'dash_callback_errors_total{{callback="{UNKNOWN_CALLBACK}"}} '
+    return next((int(line[len(prefix):]) for line in text.splitlines() if line.startswith(prefix)), 0)
+
+
+def post_output(client, output):
+    response = client.post(dash_app.config.routes_pathname_prefix + '_dash-update-component',
+                           json={'output': output, 'outputs': [], 'inputs': [], 'changedPropIds': []})
+    status = response.status_code
+    response.close()  # Streamed errors are recorded when the response is closed
+    return status
+
+
+def test_clientside_output_is_counted_as_unknown(client):
+    outputs = [output for output, entry in dash_app.callback_map.items() if 'callback' not in entry]
+    assert '..gapminder-table.data...gapminder-table-query.data..' in outputs
+    before = errors(client)
+    assert post_output(client, outputs[0]) == 500
+    assert errors(client) == before + 1
+
+
+def test_unregistered_output_is_counted_as_unknown(client):
+    before = errors(client)
+    assert post_output(client, 'no-such-component.children') == 500
+    assert errors(client) == before + 1
@@ -0,0 +1,51 @@
+"""
+Checks that callbacks keyed by session never create sessions for cookieless requests.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402,F401  Registers pages, callbacks and routes
+from pages.coalesce import request_coalescer  # noqa: E402
+from pages.login import app as dash_app, server  # noqa: E402
+
+UPDATE_PATH = dash_app.config.routes_pathname_prefix + '_dash-update-component'
+
+# update_download_link, which is coalesced per session
+DOWNLOAD_LINK = {
+    'output': 'download-btn.href',
+    'outputs': {'id': 'download-btn', 'property': 'href'},
+    'inputs': [{'id': component, 'property': 'value', 'value': value} for component, value in [
+        ('pop-min-input', None), ('pop-max-input', None), ('lifeexp-min-input', None),
+        ('lifeexp-max-input', None), ('country-dropdown', []), ('download-format', 'csv'),
+    ]],
+    'changedPropIds': ['download-format.value'],
+    'state': [],
+}
+
+
+def post(client):
+    response = client.post(UPDATE_PATH, json=DOWNLOAD_LINK)
+    response.close()
+    return response
+
+
+def test_cookieless_callback_sets_no_session():
+    client = server.test_client()
+    response = post(client)
+    assert response.status_code == 200
+    assert 'Set-Cookie' not in response.headers
+    assert client.get_cookie(server.config['SESSION_COOKIE_NAME']) is None
+
+
+def test_logged_in_callback_is_keyed_by_store_id():
+    client = server.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'password'}).close()
+    sid = client.get_cookie(server.config['SESSION_COOKIE_NAME']).value
+    response = post(client)
+    assert response.status_code == 200
+    assert 'Set-Cookie' not in response.headers
+    assert (sid, 'update_download_link') in request_coalescer._slots
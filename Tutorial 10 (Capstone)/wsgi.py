@@ -0,0 +1,55 @@
+"""
+Production entry point for the capstone app.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+gunicorn.conf.py preloads this module in the master process. Importing it
+registers every page and callback (without starting the dev server), then
+warm() loads the datasets, builds their indexes, serializes the page
+skeletons and precompresses the component bundles. Workers forked afterwards
+share those pages copy-on-write instead of each loading its own copy on its
+first request.
+"""
+import gc
+import os
+
+if not os.environ.get('SECRET_KEY'):
+    # pages/login.py falls back to a placeholder key that is only fit for the dev server
+    raise RuntimeError('Set SECRET_KEY (the same value on every worker) before starting the production server')
+
+import app  # noqa: E402,F401  Registers pages, callbacks and routes
+from pages.compression import response_compressor  # noqa: E402
+from pages.datasets import registry  # noqa: E402
+from pages.geocoder import get_geocoder  # noqa: E402
+from pages.login import app as dash_app, server  # noqa: E402
+from pages.output import layout_cache  # noqa: E402
+
+server.debug = False  # Dev tools and the reloader only exist under app.run_server(debug=True)
+
+
+def warm():
+    """
+    Does all first-use work that does not depend on a request.
+    """
+    for dataset in registry:
+        dataset.df
+        dataset.version
+        for name in dataset.index_builders:
+            dataset.index(name)
+    get_geocoder()
+    for pathname in layout_cache.pages:
+        layout_cache.payload(pathname)
+    import plotly.express  # noqa: F401  First figure build would import it otherwise
+    # Dash finishes its own setup (callback map, page registry) on the first request
+    client = server.test_client()
+    client.get(dash_app.config.routes_pathname_prefix + '_dash-dependencies')
+    client.get(dash_app.config.routes_pathname_prefix + '_dash-layout')
+    # Full-quality Brotli/gzip bundles; only the first start after an upgrade writes them
+    response_compressor.precompress(dash_app)
+    # Keep the collector from touching (and so un-sharing) everything loaded so far
+    gc.freeze()
+
+
+warm()
+
+application = server